@@ -0,0 +1,232 @@
+# Local JSON API serving the dashboard's aggregates to other tools.
+#
+#   python api_server.py --port 8600
+#   curl --compressed http://127.0.0.1:8600/api/top?metric=Installs&n=10&Type=Paid
+#
+# Endpoints:
+#   /api/version                                   dataset version and row count
+#   /api/top?metric=Installs&n=10[&Category=GAME][&Type=Paid]
+#   /api/free-paid                                 app count and installs per Type
+#   /api/installs?by=Genres|Category
+#   /api/category-series?metric=Rating|Installs&how=mean|sum
+#
+# Installs are store tiers ('10,000+'), so summed installs are ranges: the
+# sum of tier lower bounds ('Installs', 'TotalInstalls') and of upper bounds
+# ('Installs High', 'TotalInstallsHigh').
+#
+# Every response body is rendered once per dataset version and kept both
+# plain and gzipped, so repeat requests only copy bytes. The ETag is derived
+# from the version, and a matching If-None-Match gets an empty 304.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import instrumentation
+from data_pipeline import load_apps
+from queries import get_backend
+from shared_dataset import load_shared_apps
+
+# Largest n accepted by /api/top
+MAX_TOP_N = 1000
+
+# Filters /api/top accepts, matching the dashboard's top-N tables
+TOP_FILTERS = ['Category', 'Type']
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+def _param(params, name, default=None, choices=None):
+    value = params.get(name, default)
+    if value is None:
+        raise BadRequest('missing parameter: %s' % name)
+    if choices is not None and value not in choices:
+        raise BadRequest('%s must be one of %s' % (name, ', '.join(choices)))
+    return value
+
+
+# Aggregates as JSON-ready objects, computed through the same query layer
+# and sketches as the dashboard so both show the same numbers
+class Aggregates:
+    def __init__(self, dataset, queries):
+        self.dataset = dataset
+        self.queries = queries
+
+    def version(self, params):
+        return {'version': self.dataset.version, 'rows': len(self.dataset.apps_df),
+                'quarantined': len(self.dataset.quarantine)}
+
+    def top(self, params):
+        metric = _param(params, 'metric', 'Installs', ['Installs', 'Rating', 'Price', 'Reviews'])
+        try:
+            n = int(params.get('n', 10))
+        except ValueError:
+            raise BadRequest('n must be an integer')
+        if not 1 <= n <= MAX_TOP_N:
+            raise BadRequest('n must be between 1 and %d' % MAX_TOP_N)
+        filters = {column: params[column] for column in TOP_FILTERS if column in params}
+        return _records(self.queries.top_n(metric, n, **filters))
+
+    def free_paid(self, params):
+        counts = self.dataset.frequencies.frequencies('Type').set_index('Type')['Frequency']
+        installs = self.queries.installs_by('Type').set_index('Type')
+        return [{'Type': t, 'Count': int(counts.get(t, 0)),
+                 'TotalInstalls': int(installs['Installs'].get(t, 0)),
+                 'TotalInstallsHigh': int(installs['Installs High'].get(t, 0))}
+                for t in ['Free', 'Paid']]
+
+    def installs(self, params):
+        column = _param(params, 'by', 'Genres', ['Genres', 'Category'])
+        return _records(self.queries.installs_by(column))
+
+    def category_series(self, params):
+        metric = _param(params, 'metric', 'Installs', ['Installs', 'Rating'])
+        how = _param(params, 'how', 'mean' if metric == 'Rating' else 'sum', ['sum', 'mean'])
+        return _records(self.queries.category_series(metric, how))
+
+
+ENDPOINTS = {
+    '/api/version': Aggregates.version,
+    '/api/top': Aggregates.top,
+    '/api/free-paid': Aggregates.free_paid,
+    '/api/installs': Aggregates.installs,
+    '/api/category-series': Aggregates.category_series,
+}
+
+
+# A rendered response: the JSON body, its gzipped form and the ETag
+class Rendered:
+    def __init__(self, version, payload):
+        self.body = json.dumps(payload, separators=(',', ':')).encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = '"%s-%s"' % (version, hashlib.sha1(self.body).hexdigest()[:12])
+
+
+# Renders each (endpoint, parameters) once per dataset version. Entries of an
+# older version are dropped as soon as a newer version is seen.
+class ResponseCache:
+    def __init__(self, aggregates, max_entries=512):
+        self.aggregates = aggregates
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = {}
+
+    def get(self, path, params):
+        version = self.aggregates.dataset.version
+        key = (path, tuple(sorted(params.items())))
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries = {}
+            rendered = self._entries.get(key)
+        if rendered is not None:
+            instrumentation.increment('api.cache.hits')
+            return rendered
+        instrumentation.increment('api.cache.misses')
+        rendered = Rendered(version, ENDPOINTS[path](self.aggregates, params))
+        with self._lock:
+            if version == self._version:
+                if len(self._entries) >= self.max_entries:
+                    # Drop the oldest entry; dicts keep insertion order
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = rendered
+        return rendered
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client can reuse one connection
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without TCP_NODELAY the
+    # body waits for the client's delayed ACK (~40 ms on Linux)
+    disable_nagle_algorithm = True
+    cache = None
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path not in ENDPOINTS:
+            self._send_error(404, 'unknown endpoint: %s' % url.path)
+            return
+        try:
+            rendered = self.cache.get(url.path, dict(parse_qsl(url.query)))
+        except (BadRequest, ValueError) as exc:
+            self._send_error(400, str(exc))
+            return
+
+        etags = [tag.strip().removeprefix('W/') for tag in self.headers.get('If-None-Match', '').split(',')]
+        if rendered.etag in etags or '*' in etags:
+            self.send_response(304)
+            self.send_header('ETag', rendered.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            instrumentation.increment('api.not_modified')
+        else:
+            gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = rendered.gzipped if gzipped else rendered.body
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', rendered.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        instrumentation.observe('api.' + url.path, time.perf_counter() - started)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# HTTP server answering from `dataset`; port 0 picks a free port
+def make_server(dataset, queries=None, host='127.0.0.1', port=8600):
+    queries = queries or get_backend(dataset)
+    handler = type('Handler', (APIHandler,), {'cache': ResponseCache(Aggregates(dataset, queries))})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard aggregates as JSON')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--data', default='googleplaystore.csv')
+    args = parser.parse_args()
+
+    # Same loading as the dashboard, including APPS_SHARED_MEMORY and APPS_BACKEND
+    if os.environ.get('APPS_SHARED_MEMORY') == '1':
+        dataset = load_shared_apps(args.data)
+    else:
+        dataset = load_apps(args.data)
+    server = make_server(dataset, host=args.host, port=args.port)
+    print('Serving dataset %s on http://%s:%d/api/' % (dataset.version, args.host, server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
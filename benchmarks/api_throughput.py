@@ -0,0 +1,123 @@
+# Throughput of the local JSON aggregate API.
+#
+#   python -m benchmarks.api_throughput --clients 8 --duration 10
+#
+# Starts the API server in this process on a free port and runs --clients
+# keep-alive clients against it, each cycling through the endpoints. Three
+# passes are measured: plain JSON, gzip, and revalidation (If-None-Match
+# with the ETag from the first response, answered with 304). The first
+# request of each endpoint, which renders the response, is timed separately.
+
+import argparse
+import http.client
+import json
+import threading
+import time
+
+import instrumentation
+from api_server import make_server
+from data_pipeline import load_apps
+
+PATHS = [
+    '/api/version',
+    '/api/top?metric=Installs&n=10',
+    '/api/top?metric=Rating&n=10',
+    '/api/top?metric=Price&n=10',
+    '/api/top?metric=Installs&n=10&Type=Paid',
+    '/api/top?metric=Reviews&n=10&Category=GAME',
+    '/api/free-paid',
+    '/api/installs?by=Genres',
+    '/api/installs?by=Category',
+    '/api/category-series?metric=Rating&how=mean',
+    '/api/category-series?metric=Installs&how=sum',
+]
+
+MODES = {
+    'json': {},
+    'gzip': {'Accept-Encoding': 'gzip'},
+    'revalidate': {'Accept-Encoding': 'gzip'},
+}
+
+
+def fetch(connection, path, headers):
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    return response.status, response.getheader('ETag'), body
+
+
+def client(port, mode, etags, deadline, samples, sizes):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        headers = dict(MODES[mode])
+        if mode == 'revalidate':
+            headers['If-None-Match'] = etags[path]
+        started = time.perf_counter()
+        status, _, body = fetch(connection, path, headers)
+        samples.append(time.perf_counter() - started)
+        expected = 304 if mode == 'revalidate' else 200
+        if status != expected:
+            raise RuntimeError('%s answered %d, expected %d' % (path, status, expected))
+        sizes[path] = len(body)
+        i += 1
+    connection.close()
+
+
+def run_mode(port, mode, etags, clients, duration):
+    samples, sizes = [], {}
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(port, mode, etags, deadline, samples, sizes))
+               for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {'requests': len(samples), 'throughput_rps': len(samples) / elapsed,
+            'latency': instrumentation.summarize(samples), 'bytes': sizes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per pass')
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    dataset = load_apps('googleplaystore.csv')
+    server = make_server(dataset, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    # First request per endpoint renders and caches the response
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    etags, first_ms = {}, {}
+    for path in PATHS:
+        started = time.perf_counter()
+        _, etags[path], _ = fetch(connection, path, {})
+        first_ms[path] = (time.perf_counter() - started) * 1000
+    connection.close()
+
+    results = {'clients': args.clients, 'first_request_ms': first_ms, 'modes': {}}
+    print(f'{"mode":<12} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8} {"bytes/cycle":>12}')
+    for mode in MODES:
+        result = run_mode(port, mode, etags, args.clients, args.duration)
+        results['modes'][mode] = result
+        latency = result['latency']
+        print(f'{mode:<12} {result["throughput_rps"]:9.0f} {latency["p50_ms"]:8.2f} {latency["p99_ms"]:8.2f} '
+              f'{sum(result["bytes"].values()):12,}')
+    print(f'first request (render + cache) total {sum(first_ms.values()):.0f} ms over {len(PATHS)} endpoints')
+    results['server'] = instrumentation.snapshot()['counters']
+    server.shutdown()
+    server.server_close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Latency and memory of the pandas and SQLite query backends.
+#
+#   python -m benchmarks.backend_compare --rows 1000000 10000000
+#
+# For each size a resampled dataset is built, loaded into an indexed SQLite
+# file, and every dashboard query is timed on both backends (median of
+# --repeat runs) after checking that the two return the same frame. The
+# SQLite side runs in a child process that never loads the frame, so its
+# peak RSS is what serving from SQLite costs.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.headless import rss_mb
+from data_pipeline import load_apps, synthesize_apps
+from queries import PandasBackend, SQLiteBackend
+
+QUERIES = [
+    ('top_n', ('Installs', 10), {}),
+    ('top_n', ('Installs', 10), {'Type': 'Paid'}),
+    ('top_n', ('Reviews', 10), {'Category': 'GAME'}),
+    ('top_n_per_category', ('Installs', 10), {}),
+    ('installs_by', ('Genres',), {}),
+    ('installs_by', ('Category',), {}),
+    ('category_series', ('Installs', 'sum'), {}),
+    ('category_series', ('Rating', 'mean'), {}),
+]
+
+
+def label(name, args, kwargs):
+    return name + '(' + ', '.join([repr(a) for a in args] + [f'{k}={v!r}' for k, v in kwargs.items()]) + ')'
+
+
+def time_queries(backend, repeat):
+    timings, results = {}, {}
+    for name, args, kwargs in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = getattr(backend, name)(*args, **kwargs)
+            samples.append(time.perf_counter() - started)
+        timings[label(name, args, kwargs)] = statistics.median(samples) * 1000
+        results[label(name, args, kwargs)] = result
+    return timings, results
+
+
+def run_sqlite_child(path, repeat):
+    start_mb, _ = rss_mb()
+    timings, results = time_queries(SQLiteBackend(path), repeat)
+    _, peak_mb = rss_mb()
+    # Hand the results back through files so the parent can compare them
+    for i, frame in enumerate(results.values()):
+        frame.to_pickle(f'{path}.{i}.pkl')
+    return {'timings_ms': timings, 'rss_mb': peak_mb - start_mb}
+
+
+def bench(apps_df, rows, repeat, workdir):
+    frame = synthesize_apps(apps_df, rows)
+    pandas_mb = frame.memory_usage(deep=True).sum() / 2 ** 20
+
+    path = os.path.join(workdir, f'apps_{rows}.sqlite')
+    started = time.perf_counter()
+    SQLiteBackend.from_frame(frame, path, version=str(rows))
+    load_s = time.perf_counter() - started
+
+    pandas_ms, expected = time_queries(PandasBackend(frame), repeat)
+    del frame
+
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.backend_compare', '--child', path,
+                          '--repeat', str(repeat)], capture_output=True, text=True, check=True)
+    child = json.loads(out.stdout.strip().splitlines()[-1])
+    for i, frame in enumerate(expected.values()):
+        pickled = f'{path}.{i}.pkl'
+        pd.testing.assert_frame_equal(frame, pd.read_pickle(pickled), check_dtype=False)
+        os.remove(pickled)
+
+    return {'rows': rows, 'pandas_frame_mb': pandas_mb, 'sqlite_query_rss_mb': child['rss_mb'],
+            'sqlite_file_mb': os.path.getsize(path) / 2 ** 20, 'sqlite_load_s': load_s,
+            'pandas_ms': pandas_ms, 'sqlite_ms': child['timings_ms']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='also write the results as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_sqlite_child(args.child, args.repeat)))
+        return
+
+    apps_df = load_apps('googleplaystore.csv').apps_df
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            result = bench(apps_df, rows, args.repeat, workdir)
+            results.append(result)
+            print(f'\nrows={rows:,}  pandas frame {result["pandas_frame_mb"]:.0f} MB | '
+                  f'sqlite file {result["sqlite_file_mb"]:.0f} MB, query RSS {result["sqlite_query_rss_mb"]:.0f} MB, '
+                  f'load {result["sqlite_load_s"]:.1f}s')
+            print(f'{"query":<45} {"pandas ms":>10} {"sqlite ms":>10}')
+            for query, pandas_ms in result['pandas_ms'].items():
+                print(f'{query:<45} {pandas_ms:10.1f} {result["sqlite_ms"][query]:10.1f}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
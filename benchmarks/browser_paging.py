@@ -0,0 +1,64 @@
+# Page-turn latency and payload of the dataset browser versus dataset size.
+#
+#   python -m benchmarks.browser_paging --rows 10000 1000000 10000000
+#
+# For each size the first request of a sort order (building the argsort
+# permutation), the first request of a filter (masking that permutation)
+# and then page turns on the cached order are timed. Page turns and the
+# serialized page should stay flat as the row count grows.
+
+import argparse
+import json
+import statistics
+import time
+
+from browser import DatasetBrowser
+from data_pipeline import load_apps, synthesize_apps
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def bench(apps_df, rows, page_size, turns):
+    browser = DatasetBrowser(synthesize_apps(apps_df, rows))
+    query = dict(sort_by='Reviews', ascending=False)
+    filtered = dict(sort_by='Reviews', ascending=False, filters={'Category': 'GAME'})
+
+    _, sort_ms = timed(browser.page, 0, page_size, **query)
+    (_, matching), filter_ms = timed(browser.page, 0, page_size, **filtered)
+    pages = max(1, matching // page_size)
+    samples = []
+    for number in range(1, turns + 1):
+        (page, _), ms = timed(browser.page, number % pages, page_size, **filtered)
+        samples.append(ms)
+    payload = len(page.to_json(orient='records', date_format='iso'))
+    return {'rows': rows, 'first_sort_ms': sort_ms, 'first_filter_ms': filter_ms,
+            'page_turn_ms': statistics.median(samples), 'page_bytes': payload}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    apps_df = load_apps('googleplaystore.csv').apps_df
+    results = []
+    print(f'{"rows":>12} {"first sort ms":>14} {"first filter ms":>16} {"page turn ms":>13} {"page bytes":>11}')
+    for rows in args.rows:
+        result = bench(apps_df, rows, args.page_size, args.turns)
+        results.append(result)
+        print(f'{rows:12,} {result["first_sort_ms"]:14.1f} {result["first_filter_ms"]:16.1f} '
+              f'{result["page_turn_ms"]:13.3f} {result["page_bytes"]:11,}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
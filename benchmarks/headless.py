@@ -0,0 +1,64 @@
+# Helpers for driving the dashboard headlessly through Streamlit's AppTest.
+
+import os
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'google_play_analysis.py')
+
+
+# AppTest installs a mock Runtime for the duration of each run and clears it
+# afterwards, so overlapping runs in one process lose the runtime halfway
+# through. Keep handing out the most recent mock while another run is live.
+def allow_concurrent_apptests():
+    from streamlit.runtime import Runtime
+
+    if getattr(Runtime, '_concurrent_apptests', False):
+        return
+    original = Runtime.instance.__func__
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+            return cls._instance
+        if 'runtime' in last:
+            return last['runtime']
+        return original(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime._concurrent_apptests = True
+
+
+# Current and peak resident set size of this process, in MB
+def rss_mb():
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            fields[key] = value
+    return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+
+
+def new_session(script=SCRIPT, timeout=600):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+
+
+# Names of the pages offered by the sidebar radio
+def page_names(at):
+    return list(at.sidebar.radio[0].options)
+
+
+def _check(at, page):
+    if at.exception:
+        raise RuntimeError('%s: %s' % (page, at.exception[0].message))
+    return at
+
+
+# First run of a session, which renders Home
+def open_home(at):
+    return _check(at.run(), 'Home')
+
+
+def switch_page(at, page):
+    return _check(at.sidebar.radio[0].set_value(page).run(), page)
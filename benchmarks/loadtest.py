@@ -0,0 +1,164 @@
+# Concurrent-session load test for one dashboard worker.
+#
+#   python -m benchmarks.loadtest --sessions 16 --duration 120 --output loadtest.json
+#   python -m benchmarks.loadtest --sessions 16 --baseline loadtest_previous.json
+#
+# Every simulated user is a headless AppTest session in this process (the
+# same threads-in-one-process model as a Streamlit server). After loading
+# Home, each user waits an exponentially distributed think time, switches to
+# another page of a fixed mix (Home, Time Series Analysis, Game,
+# Communication and Social unless --pages says otherwise) and waits again,
+# until the test duration is up. The mix is recorded with the results, so a
+# page added to the dashboard does not change what is measured. Rerun
+# latency percentiles, throughput and RSS are written as JSON so releases
+# can be compared.
+
+import argparse
+import json
+import platform
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import streamlit
+
+import instrumentation
+from benchmarks.headless import (SCRIPT, allow_concurrent_apptests, new_session, open_home, page_names, rss_mb,
+                                 switch_page)
+
+# Pages the simulated users move between
+DEFAULT_PAGES = ['Home', 'Time Series Analysis', 'Game', 'Communication', 'Social']
+
+
+def simulate_user(user, args, deadline, samples, errors):
+    rng = np.random.default_rng(args.seed + user)
+    at = new_session(args.script)
+    started = time.perf_counter()
+    try:
+        open_home(at)
+    except Exception as exc:
+        errors.append({'user': user, 'page': 'Home', 'error': repr(exc)})
+        return
+    samples.append(('Home', time.perf_counter() - started))
+    unknown = sorted(set(args.pages) - set(page_names(at)))
+    if unknown:
+        errors.append({'user': user, 'page': None, 'error': 'unknown pages: %s' % ', '.join(unknown)})
+        return
+    current = 'Home'
+    while True:
+        time.sleep(rng.exponential(args.think_time))
+        if time.perf_counter() >= deadline:
+            return
+        current = rng.choice([page for page in args.pages if page != current])
+        started = time.perf_counter()
+        try:
+            switch_page(at, current)
+        except Exception as exc:
+            errors.append({'user': user, 'page': current, 'error': repr(exc)})
+            continue
+        samples.append((current, time.perf_counter() - started))
+
+
+def sample_memory(stop, series, interval=0.5):
+    started = time.perf_counter()
+    while not stop.is_set():
+        series.append((round(time.perf_counter() - started, 2), round(rss_mb()[0], 1)))
+        stop.wait(interval)
+
+
+def run(args):
+    allow_concurrent_apptests()
+    instrumentation.reset()
+    baseline_mb, _ = rss_mb()
+
+    samples, errors, memory = [], [], []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_memory, args=(stop, memory), daemon=True)
+    sampler.start()
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    users = []
+    for user in range(args.sessions):
+        users.append(threading.Thread(target=simulate_user, args=(user, args, deadline, samples, errors)))
+        users[-1].start()
+        # Users arrive spread over the ramp-up period
+        time.sleep(args.ramp_up / max(args.sessions, 1))
+    for thread in users:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    pages = sorted({page for page, _ in samples})
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'config': {'script': args.script, 'sessions': args.sessions, 'duration_s': args.duration,
+                   'think_time_s': args.think_time, 'ramp_up_s': args.ramp_up, 'seed': args.seed,
+                   'pages': args.pages},
+        'environment': {'python': platform.python_version(), 'streamlit': streamlit.__version__,
+                        'machine': platform.machine()},
+        'elapsed_s': elapsed,
+        'reruns': len(samples),
+        'errors': errors,
+        'throughput_rps': len(samples) / elapsed,
+        'latency': instrumentation.summarize([seconds for _, seconds in samples]),
+        'latency_by_page': {page: instrumentation.summarize([s for p, s in samples if p == page]) for page in pages},
+        'memory': {'baseline_mb': baseline_mb, 'peak_mb': rss_mb()[1], 'final_mb': rss_mb()[0],
+                   'series': memory},
+        'server': instrumentation.snapshot(),
+    }
+
+
+# Print the headline numbers next to an earlier run's
+def compare(result, baseline):
+    if baseline['config'].get('pages') != result['config']['pages']:
+        print(f'warning: the baseline visited {baseline["config"].get("pages")}, this run {result["config"]["pages"]}')
+    rows = [('throughput_rps', result['throughput_rps'], baseline['throughput_rps'])]
+    for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+        rows.append(('latency ' + key, result['latency'].get(key), baseline['latency'].get(key)))
+    rows.append(('peak_mb', result['memory']['peak_mb'], baseline['memory']['peak_mb']))
+    print(f'{"metric":<20} {"baseline":>10} {"current":>10} {"change":>8}')
+    for name, current, previous in rows:
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous * 100 if previous else float('nan')
+        print(f'{name:<20} {previous:10.1f} {current:10.1f} {change:+7.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--script', default=SCRIPT)
+    parser.add_argument('--sessions', type=int, default=8, help='concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of simulated traffic')
+    parser.add_argument('--think-time', type=float, default=3.0, help='mean seconds between page switches')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='seconds over which users arrive')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES, help='pages the users switch between')
+    parser.add_argument('--output', default='loadtest_results.json')
+    parser.add_argument('--baseline', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+    if len(set(args.pages)) < 2:
+        parser.error('--pages needs at least two pages')
+
+    result = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    latency = result['latency']
+    print(f'{result["reruns"]} reruns from {args.sessions} sessions in {result["elapsed_s"]:.1f}s '
+          f'({result["throughput_rps"]:.2f}/s), {len(result["errors"])} errors')
+    if latency['count']:
+        print(f'latency p50 {latency["p50_ms"]:.0f} ms, p95 {latency["p95_ms"]:.0f} ms, p99 {latency["p99_ms"]:.0f} ms')
+    view_cache = result['server']['hit_rates'].get('view_cache')
+    if view_cache is not None:
+        print(f'view cache hit rate {view_cache:.1%}')
+    print(f'RSS peak {result["memory"]["peak_mb"]:.0f} MB; results written to {args.output}')
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
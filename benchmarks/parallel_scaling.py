@@ -0,0 +1,87 @@
+# Scaling benchmark for the process-pool query backend.
+#
+#   python -m benchmarks.parallel_scaling --rows 10000000 --max-workers 32
+#
+# Runs every dashboard query (plus building the quantile and frequency
+# sketches) once on the pandas backend, then on the parallel backend with
+# 1, 2, 4, ... workers, and checks every parallel result against the pandas
+# one. Sketches are approximate by design, so only the queries are compared.
+# Each worker builds one sketch partial and the partials are merged pairwise
+# in the pool, so the sketch time should fall with the worker count as long
+# as there are that many cores; the core count is recorded with the results.
+# Partitioning by Category keeps each category in one task, so FAMILY (about
+# 18% of the rows) bounds the speedup; the default hashes App instead.
+
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.backend_compare import QUERIES, label
+from data_pipeline import FREQUENCY_DIMENSIONS, SKETCH_COLUMNS, load_apps, synthesize_apps
+from queries import PandasBackend, ParallelBackend
+from sketches import ColumnSketches, FrequencySketches
+
+
+def run_queries(backend):
+    results = {}
+    started = time.perf_counter()
+    for name, args, kwargs in QUERIES:
+        results[label(name, args, kwargs)] = getattr(backend, name)(*args, **kwargs)
+    return results, time.perf_counter() - started
+
+
+def serial_sketches(apps_df):
+    return ColumnSketches(SKETCH_COLUMNS, by='Category').update(apps_df), FrequencySketches(FREQUENCY_DIMENSIONS).update(apps_df)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--partition-by', choices=['App', 'Category'], default='App')
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    apps_df = synthesize_apps(load_apps('googleplaystore.csv').apps_df, args.rows)
+
+    expected, serial_seconds = run_queries(PandasBackend(apps_df))
+    serial_sketch_seconds = timed(lambda: serial_sketches(apps_df))
+    results = {'rows': args.rows, 'partition_by': args.partition_by, 'cpus': os.cpu_count(), 'serial_s': serial_seconds,
+               'serial_sketches_s': serial_sketch_seconds, 'workers': {}}
+    print(f'rows={args.rows:,} partition_by={args.partition_by} cpus={os.cpu_count()}')
+    print(f'{"workers":>8} {"queries s":>10} {"speedup":>8} {"sketches s":>11} {"speedup":>8}')
+    print(f'{"pandas":>8} {serial_seconds:10.2f} {1.0:8.2f} {serial_sketch_seconds:11.2f} {1.0:8.2f}')
+
+    workers = 1
+    while workers <= args.max_workers:
+        backend = ParallelBackend(apps_df, workers=workers, partition_by=args.partition_by)
+        try:
+            # The first query also starts the worker processes; time a warm pool
+            backend.top_n('Installs', 10)
+            parallel, seconds = run_queries(backend)
+            sketch_seconds = timed(backend.sketches)
+        finally:
+            backend.close()
+        for query, frame in expected.items():
+            pd.testing.assert_frame_equal(frame, parallel[query], check_exact=False)
+        results['workers'][workers] = {'queries_s': seconds, 'sketches_s': sketch_seconds}
+        print(f'{workers:>8} {seconds:10.2f} {serial_seconds / seconds:8.2f} '
+              f'{sketch_seconds:11.2f} {serial_sketch_seconds / sketch_seconds:8.2f}')
+        workers *= 2
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
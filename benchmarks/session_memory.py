@@ -0,0 +1,75 @@
+# Memory cost of each additional dashboard session.
+#
+#   python -m benchmarks.session_memory --sessions 1 2 4 8
+#   python -m benchmarks.session_memory --script old_google_play_analysis.py
+#
+# For each session count a fresh interpreter opens that many headless
+# sessions (Streamlit's AppTest) at once, each visiting every page, and
+# reports the peak RSS. The slope over session counts is the RSS cost of one
+# more concurrent user.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from benchmarks.headless import (SCRIPT, allow_concurrent_apptests, new_session, open_home, page_names, rss_mb,
+                                 switch_page)
+
+
+def run_sessions(script, sessions):
+    allow_concurrent_apptests()
+    baseline, _ = rss_mb()
+    apps = [new_session(script) for _ in range(sessions)]
+    errors = []
+
+    def visit(at):
+        try:
+            open_home(at)
+            for page in page_names(at)[1:]:
+                switch_page(at, page)
+        except Exception as exc:
+            errors.append(repr(exc))
+
+    threads = [threading.Thread(target=visit, args=(at,)) for at in apps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    current, peak = rss_mb()
+    return {'sessions': sessions, 'baseline_mb': baseline, 'peak_mb': peak,
+            'settled_mb': current, 'errors': errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--script', default=SCRIPT)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_sessions(os.path.abspath(args.script), args.child)))
+        return
+
+    results = []
+    for sessions in args.sessions:
+        out = subprocess.run([sys.executable, '-m', 'benchmarks.session_memory', '--script', args.script,
+                              '--child', str(sessions)], capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f'{"sessions":>8} {"peak MB":>9} {"settled MB":>11}')
+    for result in results:
+        print(f'{result["sessions"]:>8} {result["peak_mb"]:9.1f} {result["settled_mb"]:11.1f}')
+        for error in result['errors']:
+            print('   error:', error)
+    if len(results) > 1:
+        first, last = results[0], results[-1]
+        slope = (last['peak_mb'] - first['peak_mb']) / (last['sessions'] - first['sessions'])
+        print(f'peak RSS per additional session: {slope:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
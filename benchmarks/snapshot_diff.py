@@ -0,0 +1,93 @@
+# Snapshot diff time versus snapshot size.
+#
+#   python -m benchmarks.snapshot_diff --rows 1000000 10000000
+#
+# A resampled dataset serves as the older snapshot. The newer one drops 1%
+# of its apps, adds 1% new ones, grows Reviews for 30%, moves 2% up an
+# install tier and nudges 10% of ratings. Building the two Snapshot
+# objects (dedup + app key hashing) and the hash join with deltas are
+# timed separately, and the change counts are checked against what was
+# injected.
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import INSTALL_TIERS, install_tier, load_apps, synthesize_apps
+from snapshots import Snapshot, diff_snapshots
+
+
+def evolve(before, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(before)
+    after = before[rng.random(n) >= 0.01].copy()
+    added = before.sample(n // 100, random_state=seed).copy()
+    added['App'] = added['App'] + ' (new)'
+
+    reviews = after['Reviews'].to_numpy().copy()
+    grow = rng.random(len(after)) < 0.3
+    reviews[grow] += rng.integers(1, 1000, grow.sum())
+    after['Reviews'] = reviews
+
+    installs = after['Installs'].to_numpy().copy()
+    promote = rng.random(len(after)) < 0.02
+    tiers = np.searchsorted(INSTALL_TIERS, installs[promote], side='right')
+    installs[promote] = INSTALL_TIERS[np.minimum(tiers, len(INSTALL_TIERS) - 1)]
+    after['Installs'] = installs
+    after['Installs Tier'] = install_tier(installs)
+
+    rating = after['Rating'].to_numpy().copy()
+    nudge = rng.random(len(after)) < 0.1
+    rating[nudge] = np.clip(rating[nudge] + rng.choice([-0.1, 0.1], nudge.sum()), 1, 5)
+    after['Rating'] = rating
+    return pd.concat([after, added], ignore_index=True)
+
+
+def bench(apps_df, rows):
+    before_df = synthesize_apps(apps_df, rows)
+    after_df = evolve(before_df)
+
+    started = time.perf_counter()
+    before = Snapshot('2018-08-08', before_df)
+    after = Snapshot('2018-09-08', after_df)
+    prepare_s = time.perf_counter() - started
+    del before_df, after_df
+
+    started = time.perf_counter()
+    diff = diff_snapshots(before, after)
+    diff_s = time.perf_counter() - started
+
+    summary = diff.summary()
+    assert summary['new'] == rows // 100
+    assert summary['matched'] + summary['removed'] == rows
+    started = time.perf_counter()
+    diff.movers('Reviews', 10)
+    diff.tier_transitions()
+    views_s = time.perf_counter() - started
+    return {'rows': rows, 'prepare_s': prepare_s, 'diff_s': diff_s, 'views_s': views_s, **summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    apps_df = load_apps('googleplaystore.csv').apps_df
+    results = []
+    print(f'{"rows":>12} {"prepare s":>10} {"diff s":>8} {"views s":>8} {"changed":>10} {"new":>9} {"removed":>9}')
+    for rows in args.rows:
+        result = bench(apps_df, rows)
+        results.append(result)
+        print(f'{rows:12,} {result["prepare_s"]:10.2f} {result["diff_s"]:8.2f} {result["views_s"]:8.2f} '
+              f'{result["changed"]:10,} {result["new"]:9,} {result["removed"]:9,}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
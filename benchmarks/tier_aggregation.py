@@ -0,0 +1,67 @@
+# Install totals per group: int64 groupby sum versus int8 tier counts.
+#
+#   python -m benchmarks.tier_aggregation --rows 1000000 10000000
+#
+# Both sides group a resampled dataset by Category and by Genres. The tier
+# side (InstallTiers.installs_range) also returns the upper bound of every
+# total; its lower bounds are checked against the int64 sums. Building the
+# InstallTiers codes happens once per dataset version and is timed apart.
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from data_pipeline import load_apps, synthesize_apps
+from tiers import InstallTiers
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result, statistics.median(samples) * 1000
+
+
+def bench(apps_df, rows, repeat):
+    frame = synthesize_apps(apps_df, rows)
+    tiers, build_ms = timed(lambda: InstallTiers(frame), 1)
+    result = {'rows': rows, 'build_ms': build_ms}
+    for by in ('Category', 'Genres'):
+        sums, sum_ms = timed(lambda: frame.groupby(by)['Installs'].sum(), repeat)
+        ranges, range_ms = timed(lambda: tiers.installs_range(by), repeat)
+        assert np.array_equal(ranges.set_index(by)['Installs Low'].sort_index().to_numpy(), sums.sort_index().to_numpy())
+        result[by] = {'groupby_sum_ms': sum_ms, 'tier_range_ms': range_ms}
+    result['installs_mb'] = frame['Installs'].memory_usage(index=False) / 2 ** 20
+    result['tier_mb'] = frame['Installs Tier'].memory_usage(index=False) / 2 ** 20
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    apps_df = load_apps('googleplaystore.csv').apps_df
+    results = []
+    print(f'{"rows":>12} {"by":>9} {"groupby sum ms":>15} {"tier range ms":>14}')
+    for rows in args.rows:
+        result = bench(apps_df, rows, args.repeat)
+        results.append(result)
+        for by in ('Category', 'Genres'):
+            print(f'{rows:12,} {by:>9} {result[by]["groupby_sum_ms"]:15.1f} {result[by]["tier_range_ms"]:14.1f}')
+        print(f'{"":12} one-off InstallTiers build {result["build_ms"]:.0f} ms')
+        print(f'{"":12} column size: Installs {result["installs_mb"]:.1f} MB, Installs Tier {result["tier_mb"]:.1f} MB')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Server-side paging over the cleaned frame. A sort order is an argsort
+# permutation computed once per (column, direction) and shared by every
+# session; filters select from that permutation, and the filtered order is
+# kept per query so turning a page only slices it and takes page_size rows.
+
+
+class DatasetBrowser:
+    def __init__(self, apps_df, max_queries=32):
+        self.apps_df = apps_df
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        self._orders = {}
+        self._queries = OrderedDict()
+
+    # Row positions sorted by a column, missing values last in both directions;
+    # ties keep the original row order
+    def order(self, column, ascending=True):
+        key = (column, ascending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is not None:
+            return order
+        codes, uniques = pd.factorize(self.apps_df[column], sort=True)
+        if not ascending:
+            codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+        codes[codes < 0] = len(uniques)
+        dtype = np.int32 if len(codes) < 2 ** 31 else np.int64
+        order = np.argsort(codes, kind='stable').astype(dtype)
+        with self._lock:
+            self._orders[key] = order
+        return order
+
+    # Boolean mask of the rows matching equality filters and an App substring
+    def _mask(self, filters, search):
+        mask = np.ones(len(self.apps_df), dtype=bool)
+        for column, value in filters:
+            mask &= (self.apps_df[column] == value).to_numpy()
+        if search:
+            mask &= self.apps_df['App'].str.contains(search, case=False, regex=False, na=False).to_numpy()
+        return mask
+
+    # Row positions matching the filters, in display order
+    def positions(self, sort_by=None, ascending=True, filters=None, search=''):
+        filters = tuple(sorted((filters or {}).items()))
+        key = (sort_by, ascending, filters, search)
+        with self._lock:
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+        if sort_by is None:
+            order = np.arange(len(self.apps_df))
+        else:
+            order = self.order(sort_by, ascending)
+        if filters or search:
+            order = order[self._mask(filters, search)[order]]
+        with self._lock:
+            self._queries[key] = order
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+        return order
+
+    # One page of rows (0-based page number) and the number of matching rows
+    def page(self, number, page_size=25, sort_by=None, ascending=True, filters=None, search=''):
+        order = self.positions(sort_by, ascending, filters, search)
+        start = number * page_size
+        return self.apps_df.iloc[order[start:start + page_size]], len(order)
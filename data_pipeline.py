@@ -0,0 +1,187 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from sketches import ColumnSketches, FrequencySketches
+from validation import INSTALL_TIERS, LAST_UPDATED_FORMAT, RULES, validate_chunk
+
+# Numeric columns that get a quantile sketch per Category during ingestion
+SKETCH_COLUMNS = ['Rating', 'Size', 'Price', 'Reviews']
+
+# Dimension columns with frequency sketches, mapped to the companion columns
+# whose most common value is tracked for every dimension value
+FREQUENCY_DIMENSIONS = {
+    'Category': ['Type', 'Genres'],
+    'Genres': ['Category'],
+    'Content Rating': ['Category'],
+    'Type': ['Category'],
+}
+
+# Upper bounds of the install tiers (INSTALL_TIERS holds the lower bounds): one below the next tier. The top tier is capped where the
+# store's 1-5 pattern would start the next one (5,000,000,000+).
+INSTALL_TIER_UPPER = np.append(INSTALL_TIERS[1:] - 1, 5 * 10 ** 9 - 1)
+
+INSTALL_TIER_LABELS = ['0'] + [f'{lower:,}+' for lower in INSTALL_TIERS[1:]]
+
+
+# Everything the dashboard needs from one ingestion run: the cleaned frame plus
+# the sketches that were maintained while the chunks streamed in. One
+# instance is shared read-only by every session in the process.
+class AppsDataset:
+    def __init__(self, apps_df, sketches, frequencies, quarantine, rule_counts, version=None, rating_imputed=None):
+        self.apps_df = apps_df
+        # Quantile sketches of the validated values, before ratings are imputed
+        self.sketches = sketches
+        # Boolean array, by row position: True where Rating is the imputed median
+        self.rating_imputed = np.zeros(len(apps_df), dtype=bool) if rating_imputed is None else rating_imputed
+        self.frequencies = frequencies
+        # Rows that failed validation (with a 'Reason' column) and failures per rule
+        self.quarantine = quarantine
+        self.rule_counts = rule_counts
+        # Content hash of the source data; derived caches are keyed on it
+        self.version = version
+        self._subsets = {}
+
+    def median_rating(self):
+        return self.sketches.median('Rating')
+
+    def median_reviews(self):
+        return self.sketches.median('Reviews')
+
+    # Zero-copy view for one script run: it shares every column buffer with
+    # the process-wide frame, and copy-on-write keeps any edit local to it
+    def view(self):
+        return self.apps_df.copy(deep=False)
+
+    # Apps of one category, filtered once per process and shared by all sessions
+    def category(self, name):
+        if name not in self._subsets:
+            self._subsets[name] = self.apps_df[self.apps_df['Category'] == name]
+        return self._subsets[name].copy(deep=False)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_subsets'] = {}
+        state.pop('_shared', None)
+        return state
+
+
+# Revision of the cleaning rules. It is part of every dataset version, so
+# files derived from a cleaned dataset (the SQLite store, the neighbour
+# index) are rebuilt when the same dump starts cleaning differently.
+CLEANING_REVISION = b'2'
+
+
+# Short content hash of the store dump, used as the dataset version
+def dataset_version(path):
+    digest = hashlib.sha1(CLEANING_REVISION)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+# Tier code (position in INSTALL_TIERS) of install counts
+def install_tier(installs):
+    return (np.searchsorted(INSTALL_TIERS, installs, side='right') - 1).astype(np.int8)
+
+
+# Convert a validated chunk to typed columns. Every value already matches its
+# column's format, so the conversions are plain vectorized casts. The Rating
+# imputation needs the median over all chunks and runs once ingestion is done.
+def clean_chunk(chunk):
+    # Ensure 'Last Updated' is in datetime format
+    chunk['Last Updated'] = pd.to_datetime(chunk['Last Updated'], format=LAST_UPDATED_FORMAT, errors='coerce')
+
+    chunk['Rating'] = chunk['Rating'].astype(float)
+
+    # Price: '$4.99' -> 4.99, '0' -> 0
+    chunk['Price'] = chunk['Price'].str.lstrip('$').astype(float)
+
+    # Size in MB: '19M' -> 19.0, '201k' -> 201 / 1024, 'Varies with device' -> NaN
+    size = chunk['Size'].where(chunk['Size'] != 'Varies with device')
+    number = size.str[:-1].astype(float)
+    chunk['Size'] = number.where(size.str[-1] != 'k', number / 1024)
+
+    # Installs: '1,000,000+' -> 1000000
+    chunk['Installs'] = chunk['Installs'].str.replace(',', '').str.rstrip('+').astype(np.int64)
+
+    chunk['Reviews'] = chunk['Reviews'].astype(np.int64)
+
+    # Installs tier as an int8 code into INSTALL_TIERS
+    chunk['Installs Tier'] = install_tier(chunk['Installs'].to_numpy())
+    return chunk
+
+
+# Row hashes seen so far, as sorted runs that get at least twice as long from
+# newest to oldest. A chunk is looked up with one binary search per run, and
+# adding it only merges runs of comparable size, so each hash is re-sorted
+# O(log n) times rather than once per later chunk.
+class SeenHashes:
+    def __init__(self):
+        self.runs = []
+
+    def contains(self, hashes):
+        # Sorted keys make each binary search start where the previous one ended
+        order = np.argsort(hashes, kind='stable')
+        keys = hashes[order]
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found[order] |= run[positions] == keys
+        return found
+
+    def add(self, hashes):
+        run = np.sort(hashes)
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]), kind='stable')
+        if len(run):
+            self.runs.append(run)
+
+
+# Read the store dump (optionally in chunks), dropping duplicate rows across
+# chunks, quarantining rows that fail validation and keeping the quantile and
+# frequency sketches up to date as each chunk arrives.
+def load_apps(path='googleplaystore.csv', chunksize=None):
+    sketches = ColumnSketches(SKETCH_COLUMNS, by='Category')
+    frequencies = FrequencySketches(FREQUENCY_DIMENSIONS)
+    seen = SeenHashes()
+    cleaned, quarantined = [], []
+    rule_counts = pd.Series(0, index=list(RULES))
+
+    # Read everything as text so row hashes agree between chunks
+    reader = pd.read_csv(path, dtype=str, chunksize=chunksize)
+    chunks = [reader] if chunksize is None else reader
+    for chunk in chunks:
+        # Remove duplicate rows, both inside this chunk and against earlier ones
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+        chunk = chunk[keep].copy()
+        seen.add(hashes[keep])
+
+        chunk, quarantine, counts = validate_chunk(chunk)
+        quarantined.append(quarantine)
+        rule_counts += counts
+
+        chunk = clean_chunk(chunk)
+        sketches.update(chunk)
+        frequencies.update(chunk)
+        cleaned.append(chunk)
+
+    apps_df = pd.concat(cleaned)
+    quarantine = pd.concat(quarantined)
+
+    # Fill missing ratings with the median rating (ignoring missing values)
+    rating_imputed = apps_df['Rating'].isna().to_numpy()
+    apps_df['Rating'] = apps_df['Rating'].fillna(sketches.median('Rating'))
+    return AppsDataset(apps_df, sketches, frequencies, quarantine, rule_counts, dataset_version(path), rating_imputed)
+
+
+# Blow the cleaned frame up to `rows` rows by resampling it, giving every
+# copy a distinct App name; used by the scaling benchmarks
+def synthesize_apps(apps_df, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    synthetic = apps_df.iloc[rng.integers(0, len(apps_df), rows)].reset_index(drop=True)
+    synthetic['App'] = synthetic['App'] + ' #' + pd.Series(np.arange(rows)).astype(str)
+    return synthetic
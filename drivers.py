@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.ensemble import RandomForestRegressor
+
+from data_pipeline import INSTALL_TIERS
+
+# What might drive an app's install tier and rating
+CATEGORICAL_FEATURES = ['Category', 'Type', 'Content Rating']
+NUMERIC_FEATURES = ['Price', 'Size', 'Min Android']
+FEATURES = CATEGORICAL_FEATURES + ['Genres'] + NUMERIC_FEATURES
+
+# Models fitted per target; Installs Tier is the INSTALL_TIERS code
+TARGETS = ['Installs Tier', 'Rating']
+
+
+# Minimum Android version as a number: '4.0.3 and up' -> 4.0, '4.4W and up'
+# -> 4.4, 'Varies with device' -> NaN
+def min_android_version(versions):
+    return versions.str.extract(r'^(\d+(?:\.\d+)?)', expand=False).astype(float)
+
+
+def _one_hot(codes, width):
+    rows = np.flatnonzero(codes >= 0)
+    data = np.ones(len(rows), dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, codes[rows])), shape=(len(codes), width))
+
+
+# Sparse design matrix built straight from the categorical codes: one-hot
+# blocks for Category/Type/Content Rating, a multi-hot block for the
+# ';'-separated Genres, and the numeric columns with missing values filled by
+# the median plus a missing indicator. `blocks` maps each feature to its
+# column range so importances and partial dependence can be read per feature.
+class FeatureMatrix:
+    def __init__(self, apps_df):
+        n = len(apps_df)
+        parts, self.names, self.blocks, self.labels, self.fills = [], [], {}, {}, {}
+
+        def add(feature, matrix, names):
+            start = len(self.names)
+            parts.append(matrix)
+            self.names.extend(names)
+            self.blocks[feature] = (start, len(self.names))
+
+        for feature in CATEGORICAL_FEATURES:
+            codes, labels = pd.factorize(apps_df[feature], sort=True)
+            self.labels[feature] = list(labels)
+            add(feature, _one_hot(codes, len(labels)), [f'{feature}={label}' for label in labels])
+
+        genres = apps_df['Genres'].reset_index(drop=True).str.split(';').explode()
+        codes, labels = pd.factorize(genres, sort=True)
+        present = codes >= 0
+        data = np.ones(present.sum(), dtype=np.float32)
+        matrix = sparse.csr_matrix((data, (genres.index[present], codes[present])), shape=(n, len(labels)))
+        # A genre listed twice for one app still counts once
+        matrix.data[:] = 1
+        self.labels['Genres'] = list(labels)
+        add('Genres', matrix, [f'Genres={label}' for label in labels])
+
+        numeric = pd.DataFrame({'Price': apps_df['Price'].to_numpy(), 'Size': apps_df['Size'].to_numpy(),
+                                'Min Android': min_android_version(apps_df['Android Ver']).to_numpy()})
+        for feature in NUMERIC_FEATURES:
+            values = numeric[feature].to_numpy(dtype=np.float32)
+            missing = np.isnan(values)
+            self.fills[feature] = float(np.nanmedian(values)) if (~missing).any() else 0.0
+            values = np.where(missing, self.fills[feature], values)
+            columns = [values, missing.astype(np.float32)] if missing.any() else [values]
+            names = [feature, feature + ' missing'][:len(columns)]
+            add(feature, sparse.csr_matrix(np.column_stack(columns)), names)
+        self.numeric = numeric
+
+        self.X = sparse.hstack(parts, format='csr', dtype=np.float32)
+
+
+# Random forest explaining one target from the feature matrix. Trees are
+# fitted in parallel (n_jobs=-1 uses every core) on a random sample of at
+# most max_rows rows, so fit time does not grow with the dataset. The sample
+# is small enough to densify, and the dense splitter is ~3x faster than the
+# sparse one, which scans whole columns. The score is R^2 on held-out rows.
+# Only rows where `observed` is True are used for fitting and scoring.
+class DriverModel:
+    def __init__(self, features, target, y, n_estimators=60, max_rows=50_000, n_jobs=-1, seed=0, observed=None):
+        self.features = features
+        self.target = target
+        candidates = np.arange(features.X.shape[0]) if observed is None else np.flatnonzero(observed)
+        rows = np.random.default_rng(seed).permutation(candidates)
+        holdout = min(20_000, len(rows) // 5)
+        test, train = rows[:holdout], rows[holdout:holdout + max_rows]
+        self.model = RandomForestRegressor(n_estimators=n_estimators, min_samples_leaf=5, max_features=0.3,
+                                           n_jobs=n_jobs, random_state=seed)
+        self.model.fit(features.X[train].toarray(), y[train])
+        self._score = self.model.score(features.X[test].toarray(), y[test])
+        self._partial = {}
+
+    def score(self):
+        return self._score
+
+    # Impurity importance summed over each feature's columns
+    def importances(self):
+        columns = self.model.feature_importances_
+        totals = {feature: columns[start:stop].sum() for feature, (start, stop) in self.features.blocks.items()}
+        return pd.Series(totals, name='Importance').rename_axis('Feature').sort_values(ascending=False).reset_index()
+
+    # Most important individual columns (single categories, genres, numbers)
+    def column_importances(self, n=15):
+        importances = pd.Series(self.model.feature_importances_, index=self.features.names, name='Importance')
+        return importances.nlargest(n).rename_axis('Column').reset_index()
+
+    # Average prediction over a row sample with `feature` forced to each grid
+    # value: quantiles of a numeric feature, or every level of a categorical one
+    def partial_dependence(self, feature, grid=20, sample=500, seed=0):
+        key = (feature, grid, sample, seed)
+        if key not in self._partial:
+            self._partial[key] = self._partial_dependence(feature, grid, sample, seed)
+        return self._partial[key]
+
+    def _partial_dependence(self, feature, grid, sample, seed):
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(self.features.X.shape[0], min(sample, self.features.X.shape[0]), replace=False)
+        base = self.features.X[rows].toarray()
+        start, stop = self.features.blocks[feature]
+
+        if feature in NUMERIC_FEATURES:
+            values = self.features.numeric[feature].dropna().to_numpy()
+            points = np.unique(np.quantile(values, np.linspace(0.02, 0.98, grid)))
+            labels = points
+            # A forced value is never missing, so the '<feature> missing' column goes to 0
+            settings = [{start: point, **({start + 1: 0.0} if stop - start > 1 else {})} for point in points]
+        else:
+            labels = self.features.labels[feature]
+            settings = [{start + i: 1.0} for i in range(stop - start)]
+
+        averages = []
+        for setting in settings:
+            X = base.copy()
+            if feature not in NUMERIC_FEATURES:
+                X[:, start:stop] = 0
+            for column, value in setting.items():
+                X[:, column] = value
+            averages.append(self.model.predict(X).mean())
+        return pd.DataFrame({feature: labels, self.target: averages})
+
+
+# Fit one model per target on a shared feature matrix. The Rating model only
+# learns from observed ratings; rows flagged in `rating_imputed` hold the
+# median fill and would teach it the imputation.
+def fit_drivers(apps_df, rating_imputed=None, n_estimators=60, max_rows=50_000, n_jobs=-1):
+    features = FeatureMatrix(apps_df)
+    observed = {'Rating': None if rating_imputed is None else ~rating_imputed}
+    return {target: DriverModel(features, target, apps_df[target].to_numpy(dtype=float), n_estimators, max_rows,
+                                n_jobs, observed=observed.get(target))
+            for target in TARGETS}
+
+
+# Lower bound of the install tier a (possibly fractional) predicted code falls in
+def tier_label(code):
+    return f'{INSTALL_TIERS[int(np.clip(np.round(code), 0, len(INSTALL_TIERS) - 1))]:,}+'
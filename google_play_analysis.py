@@ -3,66 +3,144 @@
 # streamlit run google_play_analysis.py
 
 
+# Set APPS_SHARED_MEMORY=1 when running several dashboard processes on one
+# host so they share a single copy of the dataset
+
+
+import os
+import time
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-# Load the dataset
-apps_df = pd.read_csv('googleplaystore.csv')
+import instrumentation
+from browser import DatasetBrowser
+from data_pipeline import dataset_version, load_apps
+from drivers import CATEGORICAL_FEATURES, NUMERIC_FEATURES, TARGETS, fit_drivers, tier_label
+from histograms import HISTOGRAM_COLUMNS, Histograms
+from neighbors import SimilarApps
+from queries import get_backend
+from segments import SEGMENT_NUMERIC, Segmenter
+from shared_dataset import load_shared_apps
+from snapshots import DIFF_COLUMNS, app_history, diff_snapshots, find_snapshots, load_snapshot
+from tiers import InstallTiers
+from view_cache import DEFAULT_BUDGET_MB, ViewCache, freeze
+
+
+# Load the dataset once per process (quantile and frequency sketches are
+# maintained while it is ingested); every session reads the same copy
+@st.cache_resource
+def get_dataset(path='googleplaystore.csv'):
+    if os.environ.get('APPS_SHARED_MEMORY') == '1':
+        return load_shared_apps(path)
+    return load_apps(path)
+
+dataset = get_dataset()
+
+
+# Query layer over the dataset: pandas by default, or an indexed SQLite file
+# with APPS_BACKEND=sqlite, or a process pool over every core with
+# APPS_BACKEND=parallel (APPS_WORKERS processes). Rebuilt only when the
+# dataset version changes.
+@st.cache_resource
+def get_queries(_dataset, version):
+    return get_backend(_dataset)
+
+queries = get_queries(dataset, dataset.version)
+
+
+# Server-side browser over the dataset; its sort permutations are computed
+# once per column and shared by every session
+@st.cache_resource
+def get_browser(_dataset, version):
+    return DatasetBrowser(_dataset.apps_df)
 
-# Remove duplicate rows in both datasets if any
-apps_df.drop_duplicates(inplace=True)
+browser = get_browser(dataset, dataset.version)
 
-# Ensure 'Last Updated' is in datetime format
-apps_df['Last Updated'] = pd.to_datetime(apps_df['Last Updated'], errors='coerce')
 
-# Calculate the median rating (ignoring missing values)
-median_rating = apps_df['Rating'].median()
+# Dated store dumps for the Snapshot Changes page, each loaded once per file
+# version, and the diff of each pair of them
+@st.cache_resource
+def get_snapshot(path, version, _dataset=None):
+    return load_snapshot(path, dataset=_dataset)
 
-# Fill missing ratings with the median
-apps_df['Rating'] = apps_df['Rating'].fillna(median_rating)
+@st.cache_resource
+def get_snapshot_diff(_before, _after, before_version, after_version):
+    return diff_snapshots(_before, _after)
 
-# Drop rows where 'Type', 'Content Rating', 'Current Ver', or 'Android Ver' are missing
-apps_df = apps_df.dropna(subset=['Type', 'Content Rating', 'Current Ver', 'Android Ver'])
+# Content version of a snapshot dump, hashed only when its size or
+# modification time changes rather than on every rerun
+@st.cache_resource
+def get_file_version(path, mtime_ns, size):
+    return dataset_version(path)
 
-# Clean the 'Price' column to ensure it's numeric
-apps_df['Price'] = apps_df['Price'].replace('[\$,]', '', regex=True)  # Remove '$' and ','
-apps_df['Price'] = pd.to_numeric(apps_df['Price'], errors='coerce')  # Convert to numeric, invalid parsing will be set to NaN
+def file_version(path):
+    stat = os.stat(path)
+    return get_file_version(path, stat.st_mtime_ns, stat.st_size)
 
-# Handle NaN values in Price by filling with 0 
-apps_df['Price'] = apps_df['Price'].fillna(0)
 
-# Clean 'Size' column to ensure it is numeric
-def parse_size(size):
-    if isinstance(size, str):
-        size = size.lower().replace('m', '').replace('k', '').strip()
-        try:
-            size = float(size)
-        except ValueError:
-            return None
-    return size
+# Random forests explaining install tier and rating, fitted once per dataset version
+@st.cache_resource(show_spinner='Fitting driver models...')
+def get_drivers(_dataset, version):
+    return fit_drivers(_dataset.apps_df, _dataset.rating_imputed)
 
-apps_df['Size'] = apps_df['Size'].apply(parse_size)
 
+# MiniBatchKMeans segments and every app's cluster, fitted once per dataset
+# version and cluster count so page switches never refit
+@st.cache_resource(show_spinner='Clustering apps...')
+def get_segments(_dataset, version, n_clusters):
+    return Segmenter(_dataset.apps_df, n_clusters)
 
-# Clean 'Installs' column: remove characters like ',' and '+' then convert to numeric
-def clean_installs(installs):
-    installs = installs.replace(',', '').replace('+', '')
-    try:
-        return int(installs)
-    except:
-        return np.nan
 
-apps_df['Installs'] = apps_df['Installs'].apply(clean_installs)
+# Nearest-neighbour index for similar apps, saved next to the dataset and
+# rebuilt only when the dataset version changes
+@st.cache_resource
+def get_similar_apps(_dataset, version, path='googleplaystore.neighbors.npz'):
+    return SimilarApps.load_or_build(_dataset, path)
 
-# Ensure 'Reviews' column is numeric
-apps_df['Reviews'] = pd.to_numeric(apps_df['Reviews'], errors='coerce')  # Coerce errors to NaN
 
-# Optional: Fill NaN values with 0 or drop them based on your use case
-apps_df['Reviews'] = apps_df['Reviews'].fillna(0)  # Fill NaN values with 0
+# Fine-grained bin counts of Price, Size, Rating and log Reviews, computed
+# once per dataset version; every chart and rebinning reuses them
+@st.cache_resource
+def get_histograms(_dataset, version):
+    return Histograms(_dataset.apps_df, _dataset.rating_imputed)
 
-# Now, you can safely calculate the median of 'Reviews'
-high_reviews_apps = apps_df[apps_df['Reviews'] > apps_df['Reviews'].median()]
+
+# Group codes and rating bands for the install-tier aggregations, computed
+# once per dataset version
+@st.cache_resource
+def get_install_tiers(_dataset, version):
+    return InstallTiers(_dataset.apps_df)
+
+# Zero-copy view of the shared frame for this run
+apps_df = dataset.view()
+
+# Median of 'Reviews' served from the sketch instead of a full sort
+median_reviews = dataset.median_reviews()
+
+# Derived frames that depend on no session state, computed once per process
+# and dataset version and shared read-only by every session
+@st.cache_resource(max_entries=256)
+def get_shared_view(name, version, params, _compute):
+    return _compute()
+
+def shared_view(name, params, compute):
+    return get_shared_view(name, dataset.version, freeze(params), compute)
+
+def top_n(column, n, **kwargs):
+    return shared_view('top_n', (column, n, kwargs), lambda: queries.top_n(column, n, **kwargs))
+
+# Views that depend on this session's widgets (filters, page, chosen app),
+# kept across reruns so switching back and forth does not recompute them;
+# APPS_VIEW_CACHE_MB sets the memory budget. The cache is only referenced
+# from session state (script globals outlive the session through the cached
+# functions), so it is released with the session.
+if 'view_cache' not in st.session_state:
+    st.session_state['view_cache'] = ViewCache(float(os.environ.get('APPS_VIEW_CACHE_MB', DEFAULT_BUDGET_MB)))
+
+def session_view(name, params, compute):
+    return st.session_state['view_cache'].get(name, dataset.version, params, compute)
 
 
 
@@ -72,27 +150,57 @@ high_reviews_apps = apps_df[apps_df['Reviews'] > apps_df['Reviews'].median()]
 
 # Sidebar for navigation
 st.sidebar.title('Navigation')
-page = st.sidebar.radio('Select a page:', ['Home', 'Time Series Analysis', 'Game', 'Communication', 'Social'])
+page = st.sidebar.radio('Select a page:', ['Home', 'Distributions', 'Time Series Analysis', 'Snapshot Changes', 'Drivers', 'Segments', 'Similar Apps', 'Install Tiers', 'Game', 'Communication', 'Social'])
+
+# Server-side time of this run, recorded per page at the end of the script
+run_started = time.perf_counter()
 
 # Home Page
 if page == 'Home':
     st.title('Google Play Store Apps Analysis')
     
-    # Display a subheader for the dataset preview
-    st.subheader('Dataset Preview (First 10 Rows)')
-
-    # Show the first 10 rows of the dataset in a table format
-    st.dataframe(apps_df.head(10))  # Show the first 10 rows of the dataset
+    # Display a subheader for the dataset browser
+    st.subheader('Dataset Browser')
+
+    # Sorting and filtering run on the server; only the current page is sent
+    sort_col, order_col, size_col = st.columns(3)
+    sort_by = sort_col.selectbox('Sort by:', ['(none)'] + list(apps_df.columns), key='browse_sort')
+    ascending = order_col.radio('Order:', ['Ascending', 'Descending'], horizontal=True, key='browse_order') == 'Ascending'
+    page_size = size_col.selectbox('Rows per page:', [10, 25, 50, 100], key='browse_page_size')
+
+    category_col, type_col, search_col = st.columns(3)
+    browse_category = category_col.selectbox('Category:', ['All'] + sorted(dataset.frequencies.frequencies('Category')['Category']), key='browse_category')
+    browse_type = type_col.selectbox('Type:', ['All', 'Free', 'Paid'], key='browse_type')
+    browse_search = search_col.text_input('App name contains:', key='browse_search')
+
+    browse_filters = {column: value for column, value in [('Category', browse_category), ('Type', browse_type)] if value != 'All'}
+    browse_args = dict(sort_by=None if sort_by == '(none)' else sort_by, ascending=ascending,
+                       filters=browse_filters, search=browse_search.strip())
+    matching_rows = len(browser.positions(**browse_args))
+    page_count = max(1, -(-matching_rows // page_size))
+    page_number = st.number_input(f'Page (of {page_count}):', min_value=1, max_value=page_count, value=1, key='browse_page')
+
+    # Show the current page of the dataset in a table format
+    page_rows = session_view('browse_page', (page_number, page_size, browse_args),
+                             lambda: browser.page(page_number - 1, page_size, **browse_args)[0])
+    st.dataframe(page_rows)
+    st.caption(f'Rows {min((page_number - 1) * page_size + 1, matching_rows)}-{(page_number - 1) * page_size + len(page_rows)} of {matching_rows}')
+
+    # Rows that failed validation are kept out of every chart below
+    with st.expander(f'Data Quality: {len(dataset.quarantine)} Quarantined Rows'):
+        rule_counts = dataset.rule_counts.rename_axis('Rule').reset_index(name='Failing Rows')
+        st.dataframe(rule_counts[rule_counts['Failing Rows'] > 0])
+        st.dataframe(dataset.quarantine)
 
     st.header('Categorization of Apps Based on Analysis')
 
     # Top 10 most installed apps
-    top10_installs = apps_df.sort_values(by='Installs', ascending=False).head(10)
+    top10_installs = top_n('Installs', 10)
     st.subheader('Top 10 Most Installed Apps')
     st.write(top10_installs[['App', 'Installs']])
 
     # Top 10 most rated apps
-    top10_rated = apps_df.sort_values(by='Rating', ascending=False).head(10)
+    top10_rated = top_n('Rating', 10)
     st.subheader('Top 10 Highest Rated Apps')
     st.write(top10_rated[['App', 'Rating']])
 
@@ -105,21 +213,24 @@ if page == 'Home':
     st.subheader('Insight: High Reviews and Good Ratings')
 
     # Find apps with high reviews and good ratings vs low reviews and high ratings
-    high_reviews_apps = apps_df[apps_df['Reviews'] > apps_df['Reviews'].median()]
-    high_rated_apps = apps_df[apps_df['Rating'] > 4]
+    high_reviews_apps = shared_view('high_reviews_apps', median_reviews,
+                                    lambda: apps_df[apps_df['Reviews'] > median_reviews])
 
     # Combine both conditions for high-rated and high-reviewed apps
-    reliable_apps = high_reviews_apps[high_reviews_apps['Rating'] > 4]
+    reliable_apps = shared_view('reliable_apps', median_reviews,
+                                lambda: high_reviews_apps[high_reviews_apps['Rating'] > 4])
     
     # Combine both conditions for high-rated but low-reviewed apps
-    unreliable_apps = apps_df[(apps_df['Reviews'] < apps_df['Reviews'].median()) & (apps_df['Rating'] > 4)]
+    unreliable_apps = shared_view('unreliable_apps', median_reviews,
+                                  lambda: apps_df[(apps_df['Reviews'] < median_reviews) & (apps_df['Rating'] > 4)])
 
     # Show insights based on Install Count
     st.write("The decision of whether an app is good or not can be further validated by its **install count**. "
              "Apps with a high install count are more likely to be trustworthy, as they have been tested by a larger audience.")
     
     # --- Graph 1: Top 10 High Rated Apps with High Number of Reviews ---
-    top_high_reviewed_apps = reliable_apps.nlargest(10, 'Rating')
+    top_high_reviewed_apps = shared_view('top_high_reviewed_apps', median_reviews,
+                                         lambda: reliable_apps.nlargest(10, 'Rating'))
     
     fig1 = px.scatter(
         top_high_reviewed_apps,
@@ -140,7 +251,8 @@ if page == 'Home':
     st.plotly_chart(fig1)
 
     # --- Graph 2: High Rated Apps vs Low Number of Reviews ---
-    top_low_reviewed_apps = unreliable_apps.nlargest(10, 'Rating')
+    top_low_reviewed_apps = shared_view('top_low_reviewed_apps', median_reviews,
+                                        lambda: unreliable_apps.nlargest(10, 'Rating'))
     
     fig2 = px.scatter(
         top_low_reviewed_apps,
@@ -171,20 +283,16 @@ if page == 'Home':
     # --- Pie chart showing App Frequency by Category ---
     st.subheader('App Frequency by Category')
 
-    # Aggregate data by Category
-    agg_data = apps_df.groupby('Category').agg(
-        Frequency=('App', 'count'),
-        Avg_Price=('Price', 'mean'),
-        Most_Common_Type=('Type', lambda x: x.value_counts().index[0] if x.notnull().any() else 'Unknown')
-    ).reset_index()
+    # Frequency, distinct apps and most common Type per Category, read from the ingestion sketches
+    agg_data = dataset.frequencies.frequencies('Category', companions=['Type'])
 
     # Create an interactive pie chart
     fig = px.pie(
-        agg_data, 
-        values='Frequency', 
-        names='Category', 
+        agg_data,
+        values='Frequency',
+        names='Category',
         title='App Frequency by Category',
-        hover_data=['Frequency']
+        hover_data=['Frequency', 'Distinct_Apps', 'Most_Common_Type']
     )
 
     # Update the pie chart to show percentages and labels on the slices
@@ -194,10 +302,36 @@ if page == 'Home':
     st.plotly_chart(fig)
 
 
+    # --- Percentile bands (p10/p50/p90) per Category, served from the quantile sketches ---
+    st.subheader('Percentile Bands by Category')
+
+    band_column = st.selectbox('Metric:', ['Rating', 'Size', 'Price'], key='band_column')
+    bands = dataset.sketches.percentile_bands((0.1, 0.5, 0.9))
+    bands = bands[bands['Column'] == band_column].sort_values(by='p50', ascending=False)
+
+    fig = px.scatter(
+        bands,
+        x='Category',
+        y='p50',
+        error_y=bands['p90'] - bands['p50'],
+        error_y_minus=bands['p50'] - bands['p10'],
+        hover_data={'p10': True, 'p50': True, 'p90': True},
+        title=f'{band_column}: p10 / p50 / p90 by Category',
+        labels={'p50': f'Median {band_column}'},
+    )
+    fig.update_layout(
+        xaxis_title='Category',
+        yaxis_title=band_column,
+        xaxis_tickangle=-45,
+        template='plotly_white'
+    )
+    st.plotly_chart(fig)
+
+
     st.subheader('Top 10 Rated Apps in Google Play Store')
 
     # 1. Get the top 10 rated apps
-    top10_apps = apps_df.sort_values(by='Rating', ascending=False).head(10)
+    top10_apps = top_n('Rating', 10)
 
     # 2. Create the interactive bar chart with different colors
     fig = px.bar(
@@ -229,7 +363,7 @@ if page == 'Home':
 
 
     # 1. Get the top 10 apps by Installs
-    top10_installs = apps_df.sort_values(by='Installs', ascending=False).head(10)
+    top10_installs = top_n('Installs', 10)
 
     # 2. Create the interactive bar chart
     fig = px.bar(
@@ -264,7 +398,7 @@ if page == 'Home':
 
 
     # 2. Get the top 10 highest-priced apps
-    top10_price = apps_df.sort_values(by='Price', ascending=False).head(10)
+    top10_price = top_n('Price', 10)
 
     # 3. Create the interactive bar chart
     fig = px.bar(
@@ -304,16 +438,14 @@ if page == 'Home':
 
 
     # 1. Prepare data
-    # Fill any missing 'Type' values to avoid errors
-    df_type = apps_df.copy()
-    df_type['Type'] = df_type['Type'].fillna('Unknown')
+    # Count apps and find the most common category per Type from the frequency sketches
+    df_type_grouped = dataset.frequencies.frequencies('Type', companions=['Category']).rename(
+        columns={'Frequency': 'Count', 'Most_Common_Category': 'Category'})
 
-    # Group by Type, counting apps, summing installs, and finding the most common genre
-    df_type_grouped = df_type.groupby('Type').agg({
-        'App': 'count',
-        'Installs': 'sum',
-        'Category': lambda x: x.value_counts().index[0] if len(x.value_counts()) > 0 else 'Unknown'
-    }).reset_index().rename(columns={'App':'Count','Installs':'TotalInstalls'})
+    # Install range per Type through the query layer
+    type_installs = queries.installs_by('Type').set_index('Type')
+    df_type_grouped['TotalInstalls'] = df_type_grouped['Type'].map(type_installs['Installs'])
+    df_type_grouped['TotalInstallsHigh'] = df_type_grouped['Type'].map(type_installs['Installs High'])
 
     # Filter to keep only Free/Paid if desired
     df_type_grouped = df_type_grouped[df_type_grouped['Type'].isin(['Free','Paid'])]
@@ -323,7 +455,7 @@ if page == 'Home':
         df_type_grouped,
         names='Type',
         values='Count',
-        hover_data=['TotalInstalls'],  # Shows total installs and top genre on hover
+        hover_data=['TotalInstalls', 'TotalInstallsHigh', 'Category'],  # Shows the install range and top category on hover
         title='Count of Free vs. Paid Apps'
     )
 
@@ -355,11 +487,8 @@ if page == 'Home':
      # Subheader for Top 10 Paid Apps Most Installed
     st.subheader('Top 10 Most Installed Paid Apps')
 
-    # Filter for paid apps
-    paid_apps = apps_df[apps_df['Type'] == 'Paid']
-
-    # Sort by number of installs, descending, and get top 10
-    top10_paid_apps = paid_apps.sort_values(by='Installs', ascending=False).head(10)
+    # Top 10 paid apps by number of installs
+    top10_paid_apps = top_n('Installs', 10, Type='Paid')
 
     # Create a bar chart for top 10 paid apps by install count
     fig = px.bar(
@@ -388,19 +517,23 @@ if page == 'Home':
 
 
 
-    # 1. Group by Genre and sum the installs for each genre
-    genre_installs = apps_df.groupby('Genres')['Installs'].sum().reset_index()
+    # 1. Sum the installs for each genre, sorted in descending order
+    # Installs are store tiers, so each total is a range: the sum of the tier
+    # lower bounds (the bar) up to the sum of the upper bounds (the error bar)
+    genre_installs = queries.installs_by('Genres')
 
-    # 2. Sort the genres by installs in descending order and select the top 10
-    top10_genres = genre_installs.sort_values(by='Installs', ascending=False).head(10)
+    # 2. Select the top 10 genres
+    top10_genres = genre_installs.head(10)
 
     # 3. Create the interactive bar chart
     fig = px.bar(
         top10_genres,
         x='Genres',
         y='Installs',
+        error_y=top10_genres['Installs High'] - top10_genres['Installs'],
+        error_y_minus=[0] * len(top10_genres),
         color='Genres',  # Color each bar differently
-        hover_data={'Genres': True, 'Installs': True},  # Show genre and install count on hover
+        hover_data={'Genres': True, 'Installs': True, 'Installs High': True},  # Show genre and install range on hover
         title='Top 10 Genres Based on Install Count'
     )
 
@@ -430,21 +563,23 @@ if page == 'Home':
     # Subheader for Top 10 Categories by Install Count
     st.subheader('Top 10 Categories by Install Count')
 
-    # Group by 'Category' and sum the installs
-    category_installs = apps_df.groupby('Category')['Installs'].sum().reset_index()
+    # Install range per 'Category' from the tier bounds, sorted by the lower bound
+    category_installs = queries.installs_by('Category')
 
-    # Sort by installs in descending order and get top 10
-    top10_category_installs = category_installs.sort_values(by='Installs', ascending=False).head(10)
+    # Get top 10
+    top10_category_installs = category_installs.head(10)
 
     # Create a bar chart for top 10 categories by install count
     fig = px.bar(
         top10_category_installs,
         x='Category',
         y='Installs',
+        error_y=top10_category_installs['Installs High'] - top10_category_installs['Installs'],
+        error_y_minus=[0] * len(top10_category_installs),
         color='Category',  # Color each category differently
         title='Top 10 Categories by Install Count',
         labels={'Category': 'App Category', 'Installs': 'Install Count'},
-        hover_data={'Installs': True},  # Show install count on hover
+        hover_data={'Installs': True, 'Installs High': True},  # Show install range on hover
     )
 
     # Customize layout for better readability
@@ -480,6 +615,56 @@ if page == 'Home':
 
 
 
+
+
+# Distributions Page
+if page == 'Distributions':
+    st.title('Distributions of Price, Size, Rating and Reviews')
+
+    histograms = get_histograms(dataset, dataset.version)
+
+    # 1. Choose the column, the split and the resolution
+    column_col, split_col = st.columns(2)
+    hist_column = column_col.selectbox('Column:', HISTOGRAM_COLUMNS, index=2, key='hist_column')
+    hist_split = split_col.radio('Split by:', ['None', 'Category', 'Type'], horizontal=True, key='hist_split')
+    hist_by = None if hist_split == 'None' else hist_split
+
+    hist_groups = None
+    if hist_by == 'Category':
+        largest = dataset.frequencies.frequencies('Category').nlargest(5, 'Frequency')['Category']
+        hist_groups = st.multiselect('Categories:', histograms.groups[(hist_column, 'Category')],
+                                     default=sorted(largest), key='hist_groups') or None
+
+    hist_bins = st.select_slider('Bins:', histograms.bin_choices(), value=50, key='hist_bins')
+    edges = histograms.edges[hist_column]
+    hist_range = st.slider('Range:', float(edges[0]), float(edges[-1]), (float(edges[0]), float(edges[-1])),
+                           key=f'hist_range_{hist_column}')
+
+    # 2. Histogram, rebinned from the precomputed counts
+    histogram = session_view('histogram', (hist_column, hist_by, hist_groups, hist_bins, hist_range),
+                             lambda: histograms.histogram(hist_column, hist_by, hist_groups, hist_bins, *hist_range))
+    fig = px.bar(
+        histogram,
+        x='Center',
+        y='Count',
+        color='Group',
+        barmode='overlay',
+        opacity=0.7,
+        hover_data={'Left': ':.2f', 'Right': ':.2f', 'Center': False},
+        title=f'Distribution of {hist_column}',
+    )
+    fig.update_traces(width=(edges[-1] - edges[0]) / hist_bins)
+    fig.update_layout(xaxis_title=hist_column, yaxis_title='Number of Apps', template='plotly_white')
+    st.plotly_chart(fig)
+    if histograms.missing[hist_column]:
+        st.caption(f'{histograms.missing[hist_column]:,} apps without a {hist_column} value are not shown.')
+
+    # 3. Empirical CDF at the fine bin resolution
+    ecdf = session_view('ecdf', (hist_column, hist_by, hist_groups), lambda: histograms.ecdf(hist_column, hist_by, hist_groups))
+    ecdf = ecdf[ecdf['Value'].between(*hist_range)]
+    fig = px.line(ecdf, x='Value', y='ECDF', color='Group', title=f'Cumulative Distribution of {hist_column}')
+    fig.update_layout(xaxis_title=hist_column, yaxis_title='Share of Apps', template='plotly_white')
+    st.plotly_chart(fig)
 
 
 # Time Series Analysis Page
@@ -509,13 +694,14 @@ elif page == 'Time Series Analysis':
 
 
         # 2. Get the top 3 most installed apps
-    top3_installs = apps_df.sort_values(by='Installs', ascending=False).head(50)
+    top3_installs = top_n('Installs', 50, columns=['App'])
 
     # 3. Filter the main dataset to include only the top 3 apps
-    top3_apps_df = apps_df[apps_df['App'].isin(top3_installs['App'])]
+    top3_apps_df = shared_view('top_installed_apps', 50, lambda: apps_df[apps_df['App'].isin(top3_installs['App'])])
 
     # 4. Group by App and Last Updated, summing the installs
-    time_series_df = top3_apps_df.groupby(['App', 'Last Updated'])['Installs'].sum().reset_index()
+    time_series_df = shared_view('installs_time_series', 50,
+                                 lambda: top3_apps_df.groupby(['App', 'Last Updated'])['Installs'].sum().reset_index())
 
     # 5. Create the interactive time series plot
     fig = px.line(
@@ -559,21 +745,21 @@ elif page == 'Time Series Analysis':
 
 
 
-    # 1. Group the apps by Genre and sum the installs for each genre
-    genre_installs = apps_df.groupby('Genres')['Installs'].sum().reset_index()
-
-    # 2. Sort the genres by total installs in descending order
-    sorted_genres = genre_installs.sort_values(by='Installs', ascending=False)
+    # 1-2. Install range for each genre, sorted by the lower bound in descending order
+    sorted_genres = queries.installs_by('Genres')
 
-    # 3. Create an interactive bar chart to show installs per genre
+    # 3. Create an interactive bar chart to show installs per genre, with the
+    # upper bound of each total as the error bar
     fig = px.bar(
         sorted_genres,
         x='Genres',
         y='Installs',
+        error_y=sorted_genres['Installs High'] - sorted_genres['Installs'],
+        error_y_minus=[0] * len(sorted_genres),
         color='Genres',  # Color each genre differently
         title='Total Install Count by Genre',
         labels={'Genres': 'App Genre', 'Installs': 'Total Installs'},
-        hover_data={'Genres': True, 'Installs': True},  # Show genre and total installs on hover
+        hover_data={'Genres': True, 'Installs': True, 'Installs High': True},  # Show genre and install range on hover
     )
 
     # 4. Customize layout for better readability and set font color to white
@@ -600,11 +786,10 @@ elif page == 'Time Series Analysis':
 
 
 
-    # 1. Ensure 'Last Updated' is in datetime format
-    apps_df['Last Updated'] = pd.to_datetime(apps_df['Last Updated'], errors='coerce')
+    # 1. 'Last Updated' is already in datetime format (parsed once when the dataset is loaded)
 
     # 2. Group by Category and Last Updated, calculating the average rating for each date
-    category_rating_time_series = apps_df.groupby(['Category', 'Last Updated'])['Rating'].mean().reset_index()
+    category_rating_time_series = queries.category_series('Rating', 'mean')
 
     # 3. Create the time series plot for each category
     fig = px.line(
@@ -640,11 +825,11 @@ elif page == 'Time Series Analysis':
 
 
 
-    # 1. Ensure 'Last Updated' is in datetime format
-    apps_df['Last Updated'] = pd.to_datetime(apps_df['Last Updated'], errors='coerce')
+    # 1. 'Last Updated' is already in datetime format (parsed once when the dataset is loaded)
 
-    # 2. Group by 'Category' and 'Last Updated', summing installs
-    category_installs_time_series = apps_df.groupby(['Category', 'Last Updated'])['Installs'].sum().reset_index()
+    # 2. Group by 'Category' and 'Last Updated', summing installs; the line is
+    # the sum of tier lower bounds and the upper bound is shown on hover
+    category_installs_time_series = queries.category_series('Installs', 'sum')
 
     # 3. Create the time series plot for each category
     fig = px.line(
@@ -653,7 +838,8 @@ elif page == 'Time Series Analysis':
         y='Installs',
         color='Category',  # Different colors for each category
         title='Time Series of Total Installs by Category',
-        labels={'Last Updated': 'Date', 'Installs': 'Total Installs'},
+        labels={'Last Updated': 'Date', 'Installs': 'Total Installs (lower bound)'},
+        hover_data={'Installs High': True},  # Show the upper bound of the install range on hover
         markers=True  # Show markers on the line plot for each data point
     )
 
@@ -661,7 +847,7 @@ elif page == 'Time Series Analysis':
     fig.update_layout(
         title='Time Series of Total Installs by Category',  # Main figure title
         xaxis_title='Date',  # X-axis title
-        yaxis_title='Total Installs',  # Y-axis title
+        yaxis_title='Total Installs (lower bound)',  # Y-axis title
         template='plotly_white',  # Clean background style
         title_x=0.5,  # Center the title
         title_font=dict(size=20, family='Arial', color='black'),  # Font style for the title
@@ -680,29 +866,19 @@ elif page == 'Time Series Analysis':
 
 
 
-    # 1. Ensure 'Last Updated' is in datetime format
-    apps_df['Last Updated'] = pd.to_datetime(apps_df['Last Updated'], errors='coerce')
-
-    # 2. Ensure 'Size' is numeric (since size might include 'M' or 'K', we need to clean it)
-    def parse_size(size):
-        if isinstance(size, str):
-            size = size.lower().replace('m', '').replace('k', '').strip()
-            try:
-                size = float(size)
-            except ValueError:
-                return None
-        return size
+    # 1. 'Last Updated' is already in datetime format (parsed once when the dataset is loaded)
 
-    apps_df['Size'] = apps_df['Size'].apply(parse_size)
+    # 2. 'Size' is already numeric (parsed once when the dataset is loaded)
 
     # 3. Get the top 10 most installed apps
-    top10_installs = apps_df.sort_values(by='Installs', ascending=False).head(700)
+    top10_installs = top_n('Installs', 700, columns=['App'])
 
     # 4. Filter the data for the top 10 most installed apps
-    top10_apps_df = apps_df[apps_df['App'].isin(top10_installs['App'])]
+    top10_apps_df = shared_view('top_installed_apps', 700, lambda: apps_df[apps_df['App'].isin(top10_installs['App'])])
 
     # 5. Group by 'App' and 'Last Updated', taking the size for each app at each update
-    size_time_series = top10_apps_df.groupby(['App', 'Last Updated'])['Size'].mean().reset_index()
+    size_time_series = shared_view('size_time_series', 700,
+                                   lambda: top10_apps_df.groupby(['App', 'Last Updated'])['Size'].mean().reset_index())
 
     # 6. Create the time series plot for the size of the top 10 apps
     fig = px.line(
@@ -764,6 +940,42 @@ elif page == 'Time Series Analysis':
 
 
 
+
+
+# Install Tiers Page
+if page == 'Install Tiers':
+    st.title('Install Tiers')
+    install_tiers = get_install_tiers(dataset, dataset.version)
+
+    # 1. Installs as bounded ranges per group
+    tier_by = st.radio('Group by:', ['Category', 'Genres'], horizontal=True, key='tier_by')
+    ranges = install_tiers.installs_range(tier_by).head(15)
+    fig = px.bar(
+        ranges,
+        x=tier_by,
+        y='Installs Low',
+        error_y=ranges['Installs High'] - ranges['Installs Low'],
+        error_y_minus=[0] * len(ranges),
+        hover_data=['Apps', 'Installs High'],
+        title=f'Total Installs per {tier_by} (lower to upper bound)',
+    )
+    fig.update_layout(yaxis_title='Installs', xaxis_tickangle=-45, template='plotly_white')
+    st.plotly_chart(fig)
+
+    # 2. Tier distribution of the largest groups
+    distribution = install_tiers.distribution(tier_by, top=15)
+    distribution = distribution.loc[:, distribution.sum() > 0]
+    fig = px.imshow(distribution, labels={'x': 'Installs Tier', 'y': tier_by, 'color': 'Share of Apps'},
+                    aspect='auto', color_continuous_scale='Blues',
+                    title=f'Install Tier Distribution per {tier_by}')
+    st.plotly_chart(fig)
+
+    # 3. Tier x rating band cross-tab
+    crosstab = install_tiers.rating_crosstab()
+    crosstab = crosstab[crosstab.sum(axis=1) > 0]
+    fig = px.imshow(crosstab, text_auto=True, aspect='auto', color_continuous_scale='Blues',
+                    labels={'color': 'Apps'}, title='Apps by Install Tier and Rating Band')
+    st.plotly_chart(fig)
 
 
 # Game Page
@@ -773,11 +985,8 @@ if page == 'Game':
     # Subheader for the Top 10 Game Apps by Install Count
     st.subheader('Top Apps in Game Category by Install Count')
 
-    # Filter for Game category apps
-    game_apps = apps_df[apps_df['Category'] == 'GAME']
-
-    # Sort by install count and get the top 10 game apps
-    top10_game_apps = game_apps.sort_values(by='Installs', ascending=False).head(10)
+    # Top 10 game apps by install count
+    top10_game_apps = top_n('Installs', 10, Category='GAME')
 
     # Create a bar chart for top 10 game apps by install count
     fig1 = px.bar(
@@ -812,7 +1021,7 @@ if page == 'Game':
     st.subheader('Highest Number of Reviews vs Install Count in Game Category')
 
     # Sort by the number of reviews and select top game apps
-    top_reviews_game_apps = game_apps.sort_values(by='Reviews', ascending=False).head(10)
+    top_reviews_game_apps = top_n('Reviews', 10, Category='GAME')
 
     # Create a scatter plot for reviews vs install count
     fig2 = px.scatter(
@@ -876,18 +1085,13 @@ if page == 'Communication':
     st.title('Communication Category Analysis')
     
 
-    # Filter for Communication category apps
-    communication_apps = apps_df[apps_df['Category'] == 'COMMUNICATION']
+    # Communication category apps, filtered once per process and shared by all sessions
+    communication_apps = dataset.category('COMMUNICATION')
     
     # Check if the Communication category contains any data
     if communication_apps.empty:
         st.write("No data available for the Communication category.")
     else:
-        # Clean the Installs column to ensure it is numeric
-        communication_apps['Installs'] = communication_apps['Installs'].replace('[\+,]', '', regex=True)  # Remove '+' and ','
-        communication_apps['Installs'] = pd.to_numeric(communication_apps['Installs'], errors='coerce')  # Convert to numeric, invalid parsing results in NaN
-        communication_apps['Reviews'] = pd.to_numeric(communication_apps['Reviews'], errors='coerce')  # Convert Reviews to numeric
-
         # Drop NaN values from 'Installs' for safe calculations
         communication_apps = communication_apps.dropna(subset=['Installs'])
 
@@ -900,7 +1104,7 @@ if page == 'Communication':
         # st.write(f"Rating: {most_installed_app['Rating']}")
         
         # --- Find the top 10 most installed apps in the Communication category ---
-        top10_installed_communication_apps = communication_apps.sort_values(by='Installs', ascending=False).head(10)
+        top10_installed_communication_apps = top_n('Installs', 10, Category='COMMUNICATION')
 
         # Create a bar chart for the top 10 most installed apps in the Communication category
         fig1 = px.bar(
@@ -921,7 +1125,7 @@ if page == 'Communication':
         st.plotly_chart(fig1)
 
         # --- Create the scatter plot for most reviewed apps vs rating ---
-        top10_reviewed_apps = communication_apps.sort_values(by='Reviews', ascending=False).head(10)
+        top10_reviewed_apps = top_n('Reviews', 10, Category='COMMUNICATION')
 
         # Create a scatter plot for most reviewed apps vs rating
         fig2 = px.scatter(
@@ -972,18 +1176,13 @@ if page == 'Social':
     st.title('Social Category Analysis')
 
 
-    # Filter for Social category apps
-    social_apps = apps_df[apps_df['Category'] == 'SOCIAL']
+    # Social category apps, filtered once per process and shared by all sessions
+    social_apps = dataset.category('SOCIAL')
     
     # Check if the Social category contains any data
     if social_apps.empty:
         st.write("No data available for the Social category.")
     else:
-        # Clean the Installs and Reviews columns to ensure they are numeric
-        social_apps['Installs'] = social_apps['Installs'].replace('[\+,]', '', regex=True)  # Remove '+' and ','
-        social_apps['Installs'] = pd.to_numeric(social_apps['Installs'], errors='coerce')  # Convert to numeric, invalid parsing results in NaN
-        social_apps['Reviews'] = pd.to_numeric(social_apps['Reviews'], errors='coerce')  # Convert Reviews to numeric
-
         # Drop NaN values from 'Installs' for safe calculations
         social_apps = social_apps.dropna(subset=['Installs'])
 
@@ -996,7 +1195,7 @@ if page == 'Social':
         # st.write(f"Rating: {most_installed_app['Rating']}")
         
         # --- Find the top 10 most installed apps in the Social category ---
-        top10_installed_social_apps = social_apps.sort_values(by='Installs', ascending=False).head(10)
+        top10_installed_social_apps = top_n('Installs', 10, Category='SOCIAL')
 
         # Create a bar chart for the top 10 most installed apps in the Social category
         fig1 = px.bar(
@@ -1017,7 +1216,7 @@ if page == 'Social':
         st.plotly_chart(fig1)
 
         # --- Create the scatter plot for most reviewed apps vs rating ---
-        top10_reviewed_apps_social = social_apps.sort_values(by='Reviews', ascending=False).head(10)
+        top10_reviewed_apps_social = top_n('Reviews', 10, Category='SOCIAL')
 
         # Create a scatter plot for most reviewed apps vs rating
         fig2 = px.scatter(
@@ -1042,3 +1241,200 @@ if page == 'Social':
         #     **Insight**: The first graph shows the top most installed apps in the Social category. Apps with higher install counts typically indicate a larger user base, which often translates to higher trust and reliability.
         #     The second graph shows the relationship between the **number of reviews** and **app rating**. Apps with higher reviews generally have a larger user base, and the ratings give an indication of how well the app is received.
         # """)
+
+
+
+
+# Snapshot Changes Page
+if page == 'Snapshot Changes':
+    st.title('Changes Between Store Snapshots')
+
+    # 1. Collect the snapshots: dated dumps in APPS_SNAPSHOT_DIR plus the loaded dataset
+    snapshot_dir = os.environ.get('APPS_SNAPSHOT_DIR', 'snapshots')
+    snapshots = [get_snapshot(path, file_version(path)) for path in find_snapshots(snapshot_dir)]
+    if dataset.version not in [snapshot.version for snapshot in snapshots]:
+        snapshots.append(get_snapshot('googleplaystore.csv', dataset.version, dataset))
+    snapshots.sort(key=lambda snapshot: snapshot.date)
+
+    if len(snapshots) < 2:
+        st.info(f"Only one snapshot is available. Add dated dumps such as "
+                f"'{snapshot_dir}/googleplaystore_2018-09-08.csv' to compare store snapshots.")
+    else:
+        # 2. Pick the two snapshots to compare (defaults to the latest two)
+        labels = [snapshot.date.strftime('%Y-%m-%d') for snapshot in snapshots]
+        from_col, to_col = st.columns(2)
+        before_label = from_col.selectbox('From snapshot:', labels, index=len(labels) - 2, key='snapshot_from')
+        after_label = to_col.selectbox('To snapshot:', labels, index=len(labels) - 1, key='snapshot_to')
+        before = snapshots[labels.index(before_label)]
+        after = snapshots[labels.index(after_label)]
+        diff = get_snapshot_diff(before, after, before.version, after.version)
+
+        # 3. Summary counts
+        summary = diff.summary()
+        for column, (name, value) in zip(st.columns(4), summary.items()):
+            column.metric(name.title() + ' Apps', f'{value:,}')
+
+        # 4. Biggest movers in the chosen column
+        st.subheader('Biggest Movers')
+        mover_column = st.selectbox('Change in:', DIFF_COLUMNS, index=2, key='mover_column')
+        diff_key = (before.version, after.version, mover_column)
+        gainers = session_view('gainers', diff_key, lambda: diff.movers(mover_column, 10, largest=True))
+        decliners = session_view('decliners', diff_key, lambda: diff.movers(mover_column, 10, largest=False))
+        movers = pd.concat([gainers, decliners]).drop_duplicates(subset='App')
+        fig = px.bar(
+            movers.sort_values(by=mover_column + ' Delta'),
+            x=mover_column + ' Delta',
+            y='App',
+            orientation='h',
+            color='Category',
+            hover_data=[mover_column + ' Before', mover_column + ' After'],
+            title=f'Largest Changes in {mover_column} ({before_label} to {after_label})',
+        )
+        fig.update_layout(template='plotly_white', yaxis_title='App')
+        st.plotly_chart(fig)
+
+        # 5. How the top movers' value developed across every snapshot
+        history_key = (tuple(snapshot.version for snapshot in snapshots), diff_key)
+        history = session_view('gainer_history', history_key, lambda: app_history(
+            snapshots, gainers['App'].head(5), mover_column if mover_column != 'Installs Tier' else 'Installs'))
+        fig = px.line(history, x='Date', y=history.columns[-1], color='App', markers=True,
+                      title='Top Gainers Across All Snapshots')
+        fig.update_layout(template='plotly_white')
+        st.plotly_chart(fig)
+
+        # 6. Install tier transitions and the apps that appeared or disappeared
+        st.subheader('Install Tier Transitions')
+        st.dataframe(diff.tier_transitions())
+
+        new_col, removed_col = st.columns(2)
+        new_col.subheader(f'New Apps ({len(diff.new_apps):,})')
+        new_col.dataframe(diff.new_apps.nlargest(100, 'Installs')[['App', 'Category', 'Installs', 'Rating']])
+        removed_col.subheader(f'Removed Apps ({len(diff.removed_apps):,})')
+        removed_col.dataframe(diff.removed_apps.nlargest(100, 'Installs')[['App', 'Category', 'Installs', 'Rating']])
+
+
+# Drivers Page
+if page == 'Drivers':
+    st.title('What Drives Installs and Ratings')
+
+    # 1. Models for both targets, shared by every session until the data changes
+    drivers = get_drivers(dataset, dataset.version)
+    target = st.selectbox('Explain:', TARGETS, key='driver_target')
+    model = drivers[target]
+    st.metric('Held-out R²', f'{model.score():.3f}')
+
+    # 2. Feature importances, per feature and per individual column
+    importance_col, column_col = st.columns(2)
+    fig = px.bar(model.importances(), x='Importance', y='Feature', orientation='h',
+                 title=f'Feature Importance for {target}')
+    fig.update_layout(template='plotly_white', yaxis={'categoryorder': 'total ascending'})
+    importance_col.plotly_chart(fig)
+
+    fig = px.bar(model.column_importances(15), x='Importance', y='Column', orientation='h',
+                 title='Most Important Individual Columns')
+    fig.update_layout(template='plotly_white', yaxis={'categoryorder': 'total ascending'})
+    column_col.plotly_chart(fig)
+
+    # 3. Partial dependence: average prediction as one feature is varied
+    st.subheader('Partial Dependence')
+    pd_feature = st.selectbox('Feature:', NUMERIC_FEATURES + CATEGORICAL_FEATURES, key='driver_feature')
+    dependence = model.partial_dependence(pd_feature)
+    hover = {}
+    if target == 'Installs Tier':
+        dependence = dependence.assign(**{'Predicted Tier': dependence[target].map(tier_label)})
+        hover = {'Predicted Tier': True}
+    if pd_feature in NUMERIC_FEATURES:
+        fig = px.line(dependence, x=pd_feature, y=target, markers=True, hover_data=hover,
+                      title=f'Partial Dependence of {target} on {pd_feature}')
+    else:
+        fig = px.bar(dependence.sort_values(by=target), x=target, y=pd_feature, orientation='h', hover_data=hover,
+                     title=f'Partial Dependence of {target} on {pd_feature}')
+    fig.update_layout(template='plotly_white')
+    st.plotly_chart(fig)
+
+
+# Segments Page
+if page == 'Segments':
+    st.title('Market Segments')
+
+    # 1. Cluster the apps (cached per dataset version and cluster count)
+    n_clusters = st.slider('Number of segments:', 3, 12, 8, key='segment_count')
+    segments = get_segments(dataset, dataset.version, n_clusters)
+    profiles = session_view('segment_profiles', n_clusters, segments.profiles)
+
+    # 2. Segment sizes and profiles
+    fig = px.bar(
+        profiles,
+        x='Cluster',
+        y='Apps',
+        color='Top Genre',
+        hover_data=['Share', 'Mean Rating', 'Median Installs', 'Paid Share', 'Top Category'],
+        title='Apps per Segment',
+    )
+    fig.update_layout(template='plotly_white', xaxis={'type': 'category'})
+    st.plotly_chart(fig)
+
+    st.subheader('Segment Profiles')
+    st.dataframe(profiles)
+
+    # Standardized numeric part of each centroid: how each segment differs from the average app
+    centers = pd.DataFrame(segments.model.cluster_centers_[:, :len(SEGMENT_NUMERIC)], columns=SEGMENT_NUMERIC)
+    fig = px.imshow(centers.T, labels={'x': 'Cluster', 'y': 'Feature', 'color': 'Std. deviations'},
+                    color_continuous_scale='RdBu_r', color_continuous_midpoint=0, aspect='auto',
+                    title='Segment Centroids (standardized)')
+    st.plotly_chart(fig)
+
+    # 3. Drill into one segment's top apps
+    st.subheader('Top Apps in a Segment')
+    cluster_col, metric_col = st.columns(2)
+    cluster = cluster_col.selectbox('Segment:', profiles['Cluster'], key='segment_cluster')
+    segment_metric = metric_col.selectbox('Ranked by:', ['Installs', 'Reviews', 'Rating', 'Price'], key='segment_metric')
+    top_segment_apps = session_view('segment_top_apps', (n_clusters, cluster, segment_metric),
+                                    lambda: segments.top_apps(cluster, 10, by=segment_metric))
+    st.dataframe(top_segment_apps[['App', 'Category', 'Genres', 'Rating', 'Reviews', 'Installs', 'Type', 'Price']])
+
+
+# Similar Apps Page
+if page == 'Similar Apps':
+    st.title('Similar Apps')
+
+    similar_apps = get_similar_apps(dataset, dataset.version)
+
+    # 1. Apps most like a chosen one (by genres, category, price, size, rating and install tier)
+    # Only the indexed apps matching the search are sent as options, at most 100 of them
+    similar_search = st.text_input('Search apps:', placeholder='Type part of an app name...', key='similar_search').strip()
+    matches = similar_apps.indexed(browser.positions(sort_by='App', search=similar_search) if similar_search else [])
+    if len(matches) > 100:
+        st.caption(f'{len(matches):,} apps match; showing the first 100. Refine the search to narrow them down.')
+    chosen_app = st.selectbox('App:', apps_df['App'].iloc[matches[:100]], index=None,
+                              placeholder='Choose a matching app...', key='similar_app')
+    similar_count = st.slider('Number of similar apps:', 5, 30, 10, key='similar_count')
+    if chosen_app is not None:
+        similar = session_view('similar_apps', (chosen_app, similar_count),
+                               lambda: similar_apps.similar(apps_df, chosen_app, similar_count))
+        st.dataframe(similar[['App', 'Category', 'Genres', 'Price', 'Size', 'Rating', 'Installs', 'Distance']])
+
+        fig = px.scatter(
+            similar,
+            x='Distance',
+            y='Rating',
+            size=similar['Installs'].clip(lower=1),
+            color='Category',
+            hover_data=['App', 'Genres', 'Installs', 'Price'],
+            title=f'Apps Similar to {chosen_app}',
+        )
+        fig.update_layout(template='plotly_white')
+        st.plotly_chart(fig)
+
+    # 2. Batch query: the closest match of every app in a category
+    st.subheader('Closest Matches Within a Category')
+    similar_category = st.selectbox('Category:', sorted(dataset.frequencies.frequencies('Category')['Category']),
+                                    key='similar_category')
+    matches = session_view('category_matches', similar_category,
+                           lambda: similar_apps.for_category(apps_df, similar_category, k=3))
+    st.dataframe(matches)
+
+
+# Record how long this run took to render the page
+instrumentation.observe('rerun.' + page, time.perf_counter() - run_started)
+instrumentation.increment('reruns')
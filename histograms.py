@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# Columns with distribution charts; Reviews is binned on a log10(1 + x) scale
+HISTOGRAM_COLUMNS = ['Price', 'Size', 'Rating', 'Log Reviews']
+GROUPINGS = [None, 'Category', 'Type']
+
+# Number of fine bins per column. Charts merge runs of them, so any divisor
+# of it is a valid bin count.
+FINE_BINS = 4000
+
+
+def histogram_values(apps_df, column):
+    if column == 'Log Reviews':
+        return np.log10(1 + apps_df['Reviews'].to_numpy(dtype=float))
+    return apps_df[column].to_numpy(dtype=float)
+
+
+# Bin counts of the numeric columns, overall and per group, computed once
+# with one bincount per (column, grouping) over FINE_BINS equal-width bins.
+# Charts at any coarser resolution or over a narrower range are sums of
+# these counts; the rows are never scanned again. Ratings flagged in
+# `rating_imputed` are the loader's fill value and count as missing.
+class Histograms:
+    def __init__(self, apps_df, rating_imputed=None, fine_bins=FINE_BINS):
+        self.fine_bins = fine_bins
+        self.edges, self.counts, self.groups, self.missing = {}, {}, {}, {}
+        codes = {by: pd.factorize(apps_df[by], sort=True) for by in GROUPINGS if by is not None}
+        for column in HISTOGRAM_COLUMNS:
+            values = histogram_values(apps_df, column)
+            if column == 'Rating' and rating_imputed is not None:
+                values = np.where(rating_imputed, np.nan, values)
+            present = ~np.isnan(values)
+            low, high = values[present].min(), values[present].max()
+            self.edges[column] = np.linspace(low, high, fine_bins + 1)
+            # The small offset keeps values that sit exactly on an edge in the bin above it
+            position = (values[present] - low) / ((high - low) or 1) * fine_bins + 1e-9
+            bins = np.minimum(position.astype(np.int64), fine_bins - 1)
+            self.missing[column] = int((~present).sum())
+            self.counts[(column, None)] = np.bincount(bins, minlength=fine_bins)[None, :]
+            self.groups[(column, None)] = ['All']
+            for by, (group_codes, labels) in codes.items():
+                flat = group_codes[present].astype(np.int64) * fine_bins + bins
+                valid = group_codes[present] >= 0
+                counts = np.bincount(flat[valid], minlength=len(labels) * fine_bins)
+                self.counts[(column, by)] = counts.reshape(len(labels), fine_bins)
+                self.groups[(column, by)] = list(labels)
+
+    # Valid bin counts for the charts
+    def bin_choices(self, smallest=10):
+        return [n for n in range(smallest, self.fine_bins + 1) if self.fine_bins % n == 0]
+
+    def _select(self, column, by, groups):
+        labels = self.groups[(column, by)]
+        counts = self.counts[(column, by)]
+        if groups is not None:
+            rows = [labels.index(group) for group in groups]
+            labels, counts = [labels[row] for row in rows], counts[rows]
+        return labels, counts
+
+    # Histogram with `bins` bins over the full range of the column, or with
+    # bins of the same width restricted to [lower, upper]; one row per group and bin
+    def histogram(self, column, by=None, groups=None, bins=50, lower=None, upper=None):
+        labels, counts = self._select(column, by, groups)
+        edges = self.edges[column]
+        factor = self.fine_bins // bins
+        merged = counts.reshape(len(labels), bins, factor).sum(axis=2)
+        coarse = edges[::factor]
+        keep = np.ones(bins, dtype=bool)
+        if lower is not None:
+            keep &= coarse[1:] > lower
+        if upper is not None:
+            keep &= coarse[:-1] < upper
+        frames = [pd.DataFrame({'Group': label, 'Left': coarse[:-1][keep], 'Right': coarse[1:][keep],
+                                'Count': row[keep]}) for label, row in zip(labels, merged)]
+        histogram = pd.concat(frames, ignore_index=True)
+        histogram['Center'] = (histogram['Left'] + histogram['Right']) / 2
+        return histogram
+
+    # Empirical CDF at every fine bin edge, per group
+    def ecdf(self, column, by=None, groups=None):
+        labels, counts = self._select(column, by, groups)
+        cumulative = counts.cumsum(axis=1)
+        totals = np.maximum(cumulative[:, -1:], 1)
+        frames = [pd.DataFrame({'Group': label, 'Value': self.edges[column][1:], 'ECDF': row / total})
+                  for label, row, total in zip(labels, cumulative, totals)]
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,57 @@
+import threading
+from collections import defaultdict, deque
+
+import numpy as np
+
+# Process-wide counters and timings. The dashboard records into them and
+# anything running in the same process (the load test harness, a metrics
+# page) reads them back with snapshot().
+_lock = threading.Lock()
+_counters = defaultdict(int)
+# Only the most recent samples of each timing are kept
+_timings = defaultdict(lambda: deque(maxlen=10000))
+
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def observe(name, seconds):
+    with _lock:
+        _timings[name].append(seconds)
+
+
+# Percentile summary of a list of latencies, in milliseconds
+def summarize(seconds):
+    if not len(seconds):
+        return {'count': 0}
+    ms = np.asarray(seconds, dtype=float) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'count': int(ms.size), 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+            'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(ms.max())}
+
+
+# Hit rate of every cache counted as '<name>.hits' and '<name>.misses'
+def hit_rates(counters):
+    rates = {}
+    for name in counters:
+        if name.endswith('.hits'):
+            prefix = name[:-len('.hits')]
+            lookups = counters[name] + counters.get(prefix + '.misses', 0)
+            rates[prefix] = counters[name] / lookups if lookups else 0.0
+    return rates
+
+
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        timings = {name: list(values) for name, values in _timings.items()}
+    return {'counters': counters, 'hit_rates': hit_rates(counters),
+            'timings': {name: summarize(values) for name, values in timings.items()}}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timings.clear()
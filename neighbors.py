@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# How much each kind of feature counts towards similarity. Numeric features
+# are standardized first; a genre set is spread over its genres so a
+# two-genre app does not weigh more than a one-genre one.
+WEIGHTS = {'Category': 1.0, 'Genres': 1.5, 'Price': 0.5, 'Size': 0.5, 'Rating': 0.75, 'Installs Tier': 1.0}
+
+# Revision of the feature code and weights. It is saved with the index, so
+# changing either one means bumping this to rebuild saved indexes; the
+# weights themselves are saved too and compared on load.
+FEATURE_REVISION = 1
+
+
+# Identifies how an index's vectors were computed
+def _format():
+    return '%d:%s' % (FEATURE_REVISION, ','.join('%s=%r' % item for item in sorted(WEIGHTS.items())))
+
+
+def _standardize(values):
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.nanmean(values)
+    scale = np.nanstd(values) or 1.0
+    return np.nan_to_num((values - mean) / scale)
+
+
+# Compact float32 feature matrix, one row per app (in frame order)
+def similarity_features(apps_df):
+    codes, categories = pd.factorize(apps_df['Category'])
+    category = np.zeros((len(apps_df), len(categories)), dtype=np.float32)
+    category[np.arange(len(apps_df)), codes] = WEIGHTS['Category']
+
+    genres = apps_df['Genres'].reset_index(drop=True).str.split(';').explode()
+    codes, labels = pd.factorize(genres)
+    multi_hot = np.zeros((len(apps_df), len(labels)), dtype=np.float32)
+    present = codes >= 0
+    multi_hot[genres.index[present], codes[present]] = 1
+    multi_hot *= WEIGHTS['Genres'] / np.sqrt(np.maximum(multi_hot.sum(axis=1, keepdims=True), 1))
+
+    numeric = np.column_stack([
+        _standardize(np.log1p(apps_df['Price'].to_numpy(dtype=float))) * WEIGHTS['Price'],
+        _standardize(np.log1p(apps_df['Size'].to_numpy(dtype=float))) * WEIGHTS['Size'],
+        _standardize(apps_df['Rating'].to_numpy(dtype=float)) * WEIGHTS['Rating'],
+        _standardize(apps_df['Installs Tier'].to_numpy()) * WEIGHTS['Installs Tier'],
+    ]).astype(np.float32)
+    return np.hstack([category, multi_hot, numeric])
+
+
+# Brute-force Euclidean neighbour index over the feature matrix, with one
+# row per app (the row with the most reviews when an app is listed twice).
+# Queries run in blocks as one matrix product each, so a whole category is
+# answered in a few BLAS calls. The index is saved next to the dataset and
+# reused until the dataset version changes.
+class SimilarApps:
+    def __init__(self, features, rows, version=None):
+        self.features = features
+        self.squared_norms = np.einsum('ij,ij->i', features, features)
+        # Position in the frame of each indexed app
+        self.rows = rows
+        self.version = version
+
+    @classmethod
+    def build(cls, apps_df, version=None):
+        order = np.argsort(-apps_df['Reviews'].to_numpy(), kind='stable')
+        rows = np.sort(order[~apps_df['App'].iloc[order].duplicated().to_numpy()])
+        return cls(similarity_features(apps_df.iloc[rows]), rows, version)
+
+    # Write to a temporary file first so a concurrent reader never sees half an index
+    def save(self, path):
+        temporary = '%s.%d.npz' % (path, os.getpid())
+        np.savez(temporary, features=self.features, rows=self.rows, version=np.array(self.version or ''),
+                 format=np.array(_format()))
+        os.replace(temporary, path)
+
+    # Load the saved index if it belongs to this dataset version and was
+    # built by the current feature code, otherwise rebuild and save it
+    @classmethod
+    def load_or_build(cls, dataset, path):
+        if os.path.exists(path):
+            with np.load(path) as saved:
+                if (str(saved['version']) == dataset.version and 'format' in saved.files
+                        and str(saved['format']) == _format()):
+                    return cls(saved['features'], saved['rows'], dataset.version)
+        index = cls.build(dataset.apps_df, dataset.version)
+        index.save(path)
+        return index
+
+    # k nearest indexed apps (index positions and distances) for each query
+    # index position; an app is never its own neighbour
+    def query(self, positions, k=10, block_elements=2 ** 24):
+        positions = np.asarray(positions)
+        k = min(k, len(self.features) - 1)
+        block = max(1, block_elements // len(self.features))
+        found, distances = [], []
+        for start in range(0, len(positions), block):
+            rows = positions[start:start + block]
+            d2 = self.squared_norms[rows, None] + self.squared_norms[None, :] - 2 * (self.features[rows] @ self.features.T)
+            d2[np.arange(len(rows)), rows] = np.inf
+            nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            near_d2 = np.take_along_axis(d2, nearest, axis=1)
+            order = np.argsort(near_d2, axis=1, kind='stable')
+            found.append(np.take_along_axis(nearest, order, axis=1))
+            distances.append(np.sqrt(np.maximum(np.take_along_axis(near_d2, order, axis=1), 0)))
+        return np.vstack(found), np.vstack(distances)
+
+    # The frame positions among `positions` that are in the index, in the given order
+    def indexed(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        found = np.minimum(np.searchsorted(self.rows, positions), len(self.rows) - 1)
+        return positions[self.rows[found] == positions]
+
+    # The k apps most similar to the named one
+    def similar(self, apps_df, app, k=10):
+        position = np.flatnonzero((apps_df['App'].iloc[self.rows] == app).to_numpy())[0]
+        found, distances = self.query([position], k)
+        similar = apps_df.iloc[self.rows[found[0]]].copy()
+        similar['Distance'] = distances[0]
+        return similar
+
+    # Each app of a category with its k most similar apps, as a long frame
+    def for_category(self, apps_df, category, k=5):
+        positions = np.flatnonzero((apps_df['Category'].iloc[self.rows] == category).to_numpy())
+        found, distances = self.query(positions, k)
+        apps = apps_df['App'].to_numpy()[self.rows]
+        return pd.DataFrame({'App': np.repeat(apps[positions], found.shape[1]),
+                             'Rank': np.tile(np.arange(1, found.shape[1] + 1), len(positions)),
+                             'Similar App': apps[found.ravel()], 'Distance': distances.ravel()})
@@ -0,0 +1,267 @@
+import os
+import pickle
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import FREQUENCY_DIMENSIONS, SKETCH_COLUMNS
+from sketches import ColumnSketches, FrequencySketches, hash_values
+
+# Columns copied into shared memory for the aggregation workers
+AGG_COLUMNS = ['App', 'Category', 'Rating', 'Reviews', 'Size', 'Installs', 'Type',
+               'Price', 'Content Rating', 'Genres', 'Last Updated']
+
+# Per-process caches of unpickled text labels and of the object arrays the
+# codes are decoded through, keyed by shared block name
+_label_cache = {}
+_lookup_cache = {}
+
+
+def _create_block(blocks, values):
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    blocks.append(block)
+    return block
+
+
+# Columns of a DataFrame laid out in shared memory blocks. Text columns are
+# stored as int32 codes (-1 for missing) plus a block holding the sorted
+# labels; numeric and datetime columns are stored as-is. Other processes
+# attach to the blocks by name and read rows without copying or pickling
+# the data.
+class SharedFrame:
+    def __init__(self, spec, blocks):
+        self.spec = spec
+        self.blocks = {block.name: block for block in blocks}
+
+    @classmethod
+    def from_frame(cls, df, columns=AGG_COLUMNS, order=None):
+        spec = {'length': len(df), 'columns': []}
+        blocks = []
+        arrays = [(name, df[name]) for name in columns]
+        # Original row position, so results can be mapped back to apps_df
+        arrays.append(('_row', pd.Series(np.arange(len(df), dtype=np.int64))))
+        for name, series in arrays:
+            labels = None
+            if series.dtype.kind in 'iufbM':
+                values = series.to_numpy()
+            else:
+                codes, uniques = pd.factorize(series, sort=True)
+                values = codes.astype(np.int32)
+                pickled = np.frombuffer(pickle.dumps(list(uniques)), dtype=np.uint8)
+                labels = _create_block(blocks, pickled).name
+            if order is not None:
+                values = values[order]
+            block = _create_block(blocks, values)
+            spec['columns'].append({'name': name, 'block': block.name, 'dtype': values.dtype.str, 'labels': labels})
+        return cls(spec, blocks)
+
+    # Attach to blocks created by another process. Processes that are not
+    # children of the creator pass track=False so their resource tracker
+    # does not unlink the blocks when they exit.
+    @classmethod
+    def attach(cls, spec, track=True):
+        blocks = []
+        for column in spec['columns']:
+            for name in (column['block'], column['labels']):
+                if name is not None:
+                    blocks.append(shared_memory.SharedMemory(name=name))
+                    if not track:
+                        resource_tracker.unregister(blocks[-1]._name, 'shared_memory')
+        return cls(spec, blocks)
+
+    def _column(self, name):
+        for column in self.spec['columns']:
+            if column['name'] == name:
+                return column
+        raise KeyError(name)
+
+    def array(self, name):
+        column = self._column(name)
+        block = self.blocks[column['block']]
+        return np.ndarray((self.spec['length'],), dtype=np.dtype(column['dtype']), buffer=block.buf)
+
+    def labels(self, name):
+        block_name = self._column(name)['labels']
+        if block_name not in _label_cache:
+            _label_cache[block_name] = pickle.loads(self.blocks[block_name].buf)
+        return _label_cache[block_name]
+
+    # Labels followed by NaN, so that code -1 decodes to a missing value
+    def _lookup(self, name):
+        block_name = self._column(name)['labels']
+        if block_name not in _lookup_cache:
+            _lookup_cache[block_name] = np.asarray(self.labels(name) + [np.nan], dtype=object)
+        return _lookup_cache[block_name]
+
+    # Rows [start, end) of the requested columns as a DataFrame. Numeric
+    # columns are views on the shared blocks; text columns are decoded.
+    def frame(self, start, end, columns=None):
+        data = {}
+        for column in self.spec['columns']:
+            if columns is not None and column['name'] not in columns:
+                continue
+            values = self.array(column['name'])[start:end]
+            if column['labels'] is not None:
+                values = self._lookup(column['name'])[values]
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    # The whole frame without copying: numeric columns are read-only views on
+    # the shared blocks and text columns are categoricals over the shared codes
+    def to_frame(self, columns=None):
+        data = {}
+        for column in self.spec['columns']:
+            if column['name'] == '_row' or (columns is not None and column['name'] not in columns):
+                continue
+            values = self.array(column['name'])
+            values.flags.writeable = False
+            if column['labels'] is not None:
+                values = pd.Categorical.from_codes(values, categories=self.labels(column['name']), validate=False)
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+
+    def unlink(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+
+# Row order that makes every partition a contiguous range, plus the
+# [start, end) bounds of each partition in that order. Hashing App spreads
+# rows evenly; partitioning by Category keeps each category in one task, but
+# FAMILY alone holds about 18% of the rows, which caps the speedup near 5x.
+def partition_rows(df, partition_by='App', partitions=None):
+    if partition_by == 'App':
+        # Hash of App spread over a fixed number of partitions
+        partitions = partitions or 4 * (os.cpu_count() or 1)
+        keys = (hash_values(df['App']) % np.uint64(partitions)).astype(np.int64)
+    else:
+        keys, _ = pd.factorize(df[partition_by], sort=True)
+    order = np.argsort(keys, kind='stable')
+    sizes = np.bincount(keys[order])
+    ends = np.cumsum(sizes)
+    bounds = [(int(end - size), int(end)) for size, end in zip(sizes, ends) if size]
+    return order, bounds
+
+
+# Group neighbouring partitions into roughly equal-sized tasks
+def plan_tasks(bounds, tasks):
+    total = bounds[-1][1] if bounds else 0
+    target = max(total // max(tasks, 1), 1)
+    plan, start = [], None
+    for lo, hi in bounds:
+        start = lo if start is None else start
+        if hi - start >= target:
+            plan.append((start, hi))
+            start = None
+    if start is not None:
+        plan.append((start, bounds[-1][1]))
+    return plan
+
+
+# Top-k rows of a metric, ranked by value (descending) then original row
+def _top_rows(values, rows, k):
+    values = np.where(np.isnan(values), -np.inf, values.astype(float))
+    order = np.lexsort((rows, -values))[:k]
+    return pd.DataFrame({'value': values[order], 'row': rows[order]})
+
+
+def _filter(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in filters.items():
+        mask &= (df[column] == value).to_numpy()
+    return df[mask]
+
+
+# Partial results over one range of rows, each computed in a worker process
+# and merged by the caller. Every one returns fresh objects: nothing may keep
+# a view on the shared blocks once the worker detaches.
+def _partial_top(df, metric, k, filters):
+    df = _filter(df, filters)
+    return _top_rows(df[metric].to_numpy(), df['_row'].to_numpy(), k)
+
+
+def _partial_top_per_category(df, metric, k):
+    top = pd.DataFrame({'Category': df['Category'], 'value': df[metric].to_numpy(dtype=float),
+                        'row': df['_row'].to_numpy()})
+    top['value'] = top['value'].fillna(-np.inf)
+    top = top.iloc[np.lexsort((top['row'].to_numpy(), -top['value'].to_numpy()))]
+    return top.groupby('Category', sort=False).head(k).reset_index(drop=True)
+
+
+def _partial_counts(df, keys):
+    return df.groupby(keys).size()
+
+
+def _partial_series(df, metric):
+    return df.groupby(['Category', 'Last Updated'])[metric].agg(['sum', 'count'])
+
+
+PARTIALS = {
+    'top': _partial_top,
+    'top_per_category': _partial_top_per_category,
+    'counts': _partial_counts,
+    'series': _partial_series,
+}
+
+
+# Worker entry point: attach to the shared frame, decode the needed columns
+# of rows [start, end) and run one partial on them
+def run_partial(spec, start, end, columns, name, *args):
+    shared = SharedFrame.attach(spec)
+    try:
+        df = shared.frame(start, end, columns)
+        result = PARTIALS[name](df, *args)
+        del df
+        return result
+    finally:
+        shared.close()
+
+
+# Worker entry point for the sketches: one quantile and frequency sketch
+# pair over rows [start, end), so each worker returns a single partial
+def run_sketches(spec, start, end):
+    shared = SharedFrame.attach(spec)
+    try:
+        columns = {'App', 'Category', *SKETCH_COLUMNS, *FREQUENCY_DIMENSIONS, *sum(FREQUENCY_DIMENSIONS.values(), [])}
+        df = shared.frame(start, end, columns)
+        result = ColumnSketches(SKETCH_COLUMNS, by='Category').update(df), FrequencySketches(FREQUENCY_DIMENSIONS).update(df)
+        del df
+        return result
+    finally:
+        shared.close()
+
+
+# Merge partial top-k lists into the positions of the overall top k
+def merge_top(parts, k):
+    candidates = pd.concat(parts, ignore_index=True)
+    order = np.lexsort((candidates['row'].to_numpy(), -candidates['value'].to_numpy()))[:k]
+    return candidates['row'].to_numpy()[order]
+
+
+# Merge partial per-category top-k lists into positions ordered by category,
+# then value (descending), then original row
+def merge_top_per_category(parts, k):
+    candidates = pd.concat(parts, ignore_index=True)
+    order = np.lexsort((candidates['row'].to_numpy(), -candidates['value'].to_numpy()))
+    top = candidates.iloc[order].groupby('Category', sort=False).head(k)
+    return top.sort_values(by='Category', kind='stable')['row'].to_numpy()
+
+
+# Merge partial group sizes into one frame with the sizes in column `name`
+def merge_counts(parts, name):
+    counts = pd.concat(parts)
+    return counts.groupby(level=list(range(counts.index.nlevels))).sum().reset_index(name=name)
+
+
+# Merge two partial sketch pairs; run in the workers as one step of a tree
+def merge_sketches(left, right):
+    left[0].merge(right[0])
+    left[1].merge(right[1])
+    return left
@@ -0,0 +1,286 @@
+import os
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import INSTALL_TIER_UPPER, INSTALL_TIERS
+from parallel_agg import (SharedFrame, merge_counts, merge_sketches, merge_top, merge_top_per_category,
+                          partition_rows, plan_tasks, run_partial, run_sketches)
+
+# The dashboard's queries, answered by pandas over the in-memory frame,
+# map-reduced over a process pool, or pushed down as SQL to an indexed
+# SQLite file. Every backend returns the same frames: a fresh 0..n-1 index,
+# ties broken by original row order.
+
+# Columns queries may name; anything else is rejected before reaching SQL
+COLUMNS = ['App', 'Category', 'Rating', 'Reviews', 'Size', 'Installs', 'Type', 'Price',
+           'Content Rating', 'Genres', 'Last Updated', 'Current Ver', 'Android Ver']
+
+# Columns with an index in the SQLite store
+INDEXED_COLUMNS = ['Category', 'Type', 'Installs', 'Rating', 'Price', 'Last Updated']
+
+# Covering indexes matching the dashboard's group-bys and per-category top-N,
+# so those run as ordered index scans without touching the table
+COVERING_INDEXES = {
+    'idx_apps_category_installs': ['Category', 'Installs'],
+    'idx_apps_genres_installs': ['Genres', 'Installs'],
+    'idx_apps_category_date': ['Category', 'Last Updated', 'Installs', 'Rating'],
+}
+
+AGGREGATES = {'sum': 'SUM', 'mean': 'AVG'}
+
+
+def _check(*columns):
+    for column in columns:
+        if column not in COLUMNS:
+            raise ValueError('unknown column: %r' % column)
+
+
+# Install totals per group from the number of apps per (group, Installs).
+# Installs holds each app's tier lower bound, so the same counts also give
+# the upper bound: every total is the range [Installs, Installs High].
+def install_ranges(counts, keys):
+    apps = counts['Apps'].to_numpy()
+    lower = counts['Installs'].to_numpy()
+    tiers = np.searchsorted(INSTALL_TIERS, lower, side='right') - 1
+    ranges = counts[keys].assign(Apps=apps, Installs=lower * apps, **{'Installs High': INSTALL_TIER_UPPER[tiers] * apps})
+    return ranges.groupby(keys, sort=True)[['Apps', 'Installs', 'Installs High']].sum().reset_index()
+
+
+def _by_installs(ranges):
+    return ranges.sort_values(by='Installs', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def _installs_series(counts):
+    return install_ranges(counts, ['Category', 'Last Updated']).drop(columns='Apps')
+
+
+class PandasBackend:
+    def __init__(self, apps_df):
+        self.apps_df = apps_df
+
+    def _filtered(self, filters):
+        df = self.apps_df
+        for column, value in filters.items():
+            df = df[df[column] == value]
+        return df
+
+    # Top n rows by a metric, optionally filtered by equality on other columns
+    def top_n(self, metric, n=10, columns=None, **filters):
+        _check(metric, *(columns or []), *filters)
+        df = self._filtered(filters).sort_values(by=metric, ascending=False, kind='stable').head(n)
+        return df[columns or COLUMNS].reset_index(drop=True)
+
+    # Top n rows by a metric within every category
+    def top_n_per_category(self, metric, n=10, columns=None):
+        _check(metric, *(columns or []))
+        df = self.apps_df.sort_values(by=metric, ascending=False, kind='stable')
+        df = df.groupby('Category', sort=False).head(n)
+        df = df.sort_values(by='Category', kind='stable')
+        return df[columns or COLUMNS].reset_index(drop=True)
+
+    def _tier_counts(self, keys):
+        return self.apps_df.groupby(keys + ['Installs']).size().reset_index(name='Apps')
+
+    # Apps and total installs (as a range) per value of a column (Genres,
+    # Category, Type), largest lower bound first
+    def installs_by(self, column):
+        _check(column)
+        return _by_installs(install_ranges(self._tier_counts([column]), [column]))
+
+    # A metric aggregated per Category and 'Last Updated' date; summed
+    # installs come with their upper bound in 'Installs High'
+    def category_series(self, metric, how='sum'):
+        _check(metric)
+        if metric == 'Installs' and how == 'sum':
+            return _installs_series(self._tier_counts(['Category', 'Last Updated']))
+        series = self.apps_df.groupby(['Category', 'Last Updated'])[metric].agg(how)
+        return series.reset_index()
+
+
+def _shutdown(pool, shared):
+    pool.shutdown(cancel_futures=True)
+    shared.unlink()
+
+
+# The pandas queries split over a pool of worker processes. The frame is
+# copied once into shared memory, ordered so that each task is a contiguous
+# range of rows (hash-partitioned by App by default); a query only sends
+# the range bounds to the workers and merges their partial results, so a
+# group-by uses every core. Float means agree with pandas up to rounding.
+class ParallelBackend:
+    def __init__(self, apps_df, workers=None, partition_by='App'):
+        self.apps_df = apps_df
+        self.workers = workers or os.cpu_count() or 1
+        order, bounds = partition_rows(apps_df, partition_by, partitions=4 * self.workers)
+        self.shared = SharedFrame.from_frame(apps_df, order=order)
+        self.tasks = plan_tasks(bounds, 4 * self.workers)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._finalizer = weakref.finalize(self, _shutdown, self.pool, self.shared)
+
+    def close(self):
+        self._finalizer()
+
+    def _map(self, columns, name, *args):
+        futures = [self.pool.submit(run_partial, self.shared.spec, start, end, columns, name, *args)
+                   for start, end in self.tasks]
+        return [future.result() for future in futures]
+
+    def top_n(self, metric, n=10, columns=None, **filters):
+        _check(metric, *(columns or []), *filters)
+        parts = self._map([metric, '_row', *filters], 'top', metric, n, filters)
+        return self.apps_df.iloc[merge_top(parts, n)][columns or COLUMNS].reset_index(drop=True)
+
+    def top_n_per_category(self, metric, n=10, columns=None):
+        _check(metric, *(columns or []))
+        parts = self._map([metric, '_row', 'Category'], 'top_per_category', metric, n)
+        return self.apps_df.iloc[merge_top_per_category(parts, n)][columns or COLUMNS].reset_index(drop=True)
+
+    def _tier_counts(self, keys):
+        return merge_counts(self._map(keys + ['Installs'], 'counts', keys + ['Installs']), 'Apps')
+
+    def installs_by(self, column):
+        _check(column)
+        return _by_installs(install_ranges(self._tier_counts([column]), [column]))
+
+    def category_series(self, metric, how='sum'):
+        _check(metric)
+        if metric == 'Installs' and how == 'sum':
+            return _installs_series(self._tier_counts(['Category', 'Last Updated']))
+        parts = self._map(['Category', 'Last Updated', metric], 'series', metric)
+        totals = pd.concat(parts).groupby(level=[0, 1]).sum()
+        values = totals['sum'] if how == 'sum' else totals['sum'] / totals['count'].replace(0, np.nan)
+        return values.rename(metric).reset_index()
+
+    # Quantile and frequency sketches of the whole frame: one partial per
+    # worker over a contiguous run of tasks, merged pairwise in the pool, so
+    # the parent does no merging and the merge takes log2(workers) rounds
+    def sketches(self):
+        groups = [group for group in np.array_split(np.arange(len(self.tasks)), self.workers) if len(group)]
+        futures = [self.pool.submit(run_sketches, self.shared.spec, self.tasks[group[0]][0], self.tasks[group[-1]][1])
+                   for group in groups]
+        parts = [future.result() for future in futures]
+        while len(parts) > 1:
+            futures = [self.pool.submit(merge_sketches, parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2)]
+            parts = [future.result() for future in futures] + parts[2 * len(futures):]
+        return parts[0]
+
+
+class SQLiteBackend:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    # One connection per thread; Streamlit serves each session from its own thread
+    @property
+    def connection(self):
+        if not hasattr(self._local, 'connection'):
+            self._local.connection = sqlite3.connect(self.path, check_same_thread=False)
+        return self._local.connection
+
+    # Load the cleaned frame into an indexed SQLite file, unless the file
+    # already holds this dataset version. The file is built under a temporary
+    # name and moved into place, so a concurrent reader or builder never sees
+    # a half-built table.
+    @classmethod
+    def from_frame(cls, apps_df, path, version=None, chunksize=100_000):
+        if version is not None and os.path.exists(path) and cls(path).version() == version:
+            return cls(path)
+        temporary = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        con = sqlite3.connect(temporary)
+        try:
+            cls._build(con, apps_df, version, chunksize)
+        finally:
+            con.close()
+        os.replace(temporary, path)
+        return cls(path)
+
+    @staticmethod
+    def _build(con, apps_df, version, chunksize):
+        frame = apps_df[COLUMNS].reset_index(drop=True)
+        # Dates as ISO text sort and compare correctly
+        frame['Last Updated'] = frame['Last Updated'].dt.strftime('%Y-%m-%d')
+        frame.to_sql('apps', con, index=True, index_label='row_id', chunksize=chunksize)
+        for column in INDEXED_COLUMNS:
+            name = 'idx_apps_' + column.lower().replace(' ', '_')
+            con.execute(f'CREATE INDEX {name} ON apps ("{column}")')
+        for name, columns in COVERING_INDEXES.items():
+            quoted = ', '.join(f'"{column}"' for column in columns)
+            con.execute(f'CREATE INDEX {name} ON apps ({quoted})')
+        con.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        con.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        con.commit()
+
+    def version(self):
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def _read(self, sql, params=()):
+        df = pd.read_sql_query(sql, self.connection, params=params)
+        # A page of all-NULL values would otherwise come back as object
+        for column in ('Rating', 'Size', 'Price'):
+            if column in df:
+                df[column] = df[column].astype(float)
+        if 'Last Updated' in df:
+            df['Last Updated'] = pd.to_datetime(df['Last Updated']).astype('datetime64[us]')
+        return df
+
+    @staticmethod
+    def _select(columns):
+        return ', '.join(f'"{column}"' for column in columns or COLUMNS)
+
+    def top_n(self, metric, n=10, columns=None, **filters):
+        _check(metric, *(columns or []), *filters)
+        where = ' AND '.join(f'"{column}" = ?' for column in filters) or '1'
+        sql = (f'SELECT {self._select(columns)} FROM apps WHERE {where} '
+               f'ORDER BY "{metric}" DESC, row_id LIMIT ?')
+        return self._read(sql, (*filters.values(), n))
+
+    # One indexed LIMIT query per category; a window function over the whole
+    # table would sort every row
+    def top_n_per_category(self, metric, n=10, columns=None):
+        _check(metric, *(columns or []))
+        categories = [row[0] for row in self.connection.execute('SELECT DISTINCT Category FROM apps ORDER BY Category')]
+        frames = [self.top_n(metric, n, columns, Category=category) for category in categories]
+        return pd.concat(frames, ignore_index=True)
+
+    # Apps per group and install tier, read from the covering indexes
+    def _tier_counts(self, keys):
+        quoted = ', '.join(f'"{key}"' for key in keys)
+        not_null = ' AND '.join(f'"{key}" IS NOT NULL' for key in keys)
+        return self._read(f'SELECT {quoted}, Installs, COUNT(*) AS Apps FROM apps WHERE {not_null} '
+                          f'GROUP BY {quoted}, Installs')
+
+    def installs_by(self, column):
+        _check(column)
+        return _by_installs(install_ranges(self._tier_counts([column]), [column]))
+
+    def category_series(self, metric, how='sum'):
+        _check(metric)
+        if metric == 'Installs' and how == 'sum':
+            return _installs_series(self._tier_counts(['Category', 'Last Updated']))
+        sql = (f'SELECT Category, "Last Updated", {AGGREGATES[how]}("{metric}") AS "{metric}" FROM apps '
+               f'WHERE "Last Updated" IS NOT NULL '
+               f'GROUP BY Category, "Last Updated" ORDER BY Category, "Last Updated"')
+        return self._read(sql)
+
+
+# Backend named by the APPS_BACKEND environment variable ('pandas', 'parallel'
+# or 'sqlite'); APPS_WORKERS sets the parallel backend's process count
+def get_backend(dataset, name=None, path=None):
+    name = name or os.environ.get('APPS_BACKEND', 'pandas')
+    if name == 'parallel':
+        return ParallelBackend(dataset.apps_df, workers=int(os.environ.get('APPS_WORKERS', 0)) or None)
+    if name == 'sqlite':
+        path = path or os.environ.get('APPS_SQLITE_PATH', 'googleplaystore.sqlite')
+        return SQLiteBackend.from_frame(dataset.apps_df, path, version=dataset.version)
+    return PandasBackend(dataset.apps_df)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+# Numeric clustering features, standardized; 'Paid' is 1 for paid apps
+SEGMENT_NUMERIC = ['Rating', 'Log Reviews', 'Installs Tier', 'Size', 'Price', 'Paid']
+
+
+def numeric_features(chunk):
+    return pd.DataFrame({
+        'Rating': chunk['Rating'].to_numpy(dtype=float),
+        'Log Reviews': np.log1p(chunk['Reviews'].to_numpy(dtype=float)),
+        'Installs Tier': chunk['Installs Tier'].to_numpy(dtype=float),
+        'Size': chunk['Size'].to_numpy(dtype=float),
+        'Price': chunk['Price'].to_numpy(dtype=float),
+        'Paid': (chunk['Type'] == 'Paid').to_numpy(dtype=float),
+    })
+
+
+# Market segments from MiniBatchKMeans over the numeric features plus a
+# multi-hot of the ';'-separated genres. Every pass walks the frame in
+# chunks, so only one chunk's feature matrix is ever materialised:
+#   1. genre vocabulary and running sums for standardization
+#   2. partial_fit on each chunk, visited in shuffled row order
+#   3. labels for every app, kept as a compact int array
+class Segmenter:
+    def __init__(self, apps_df, n_clusters=8, chunksize=50_000, epochs=2, seed=0):
+        self.apps_df = apps_df
+        self.n_clusters = n_clusters
+        self.chunksize = chunksize
+        self._scan()
+        self.model = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3)
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(apps_df))
+            for rows in self._chunks(order):
+                self.model.partial_fit(self.features(apps_df.iloc[rows]))
+        self.labels = np.concatenate([self.model.predict(self.features(apps_df.iloc[rows]))
+                                      for rows in self._chunks(np.arange(len(apps_df)))]).astype(np.int16)
+
+    def _chunks(self, order):
+        for start in range(0, len(order), self.chunksize):
+            yield order[start:start + self.chunksize]
+
+    def _scan(self):
+        genres = set()
+        total = pd.Series(0.0, index=SEGMENT_NUMERIC)
+        squares = pd.Series(0.0, index=SEGMENT_NUMERIC)
+        count = pd.Series(0, index=SEGMENT_NUMERIC)
+        for rows in self._chunks(np.arange(len(self.apps_df))):
+            chunk = self.apps_df.iloc[rows]
+            genres.update(chunk['Genres'].str.split(';').explode().dropna().unique())
+            numeric = numeric_features(chunk)
+            total += numeric.sum()
+            squares += (numeric ** 2).sum()
+            count += numeric.count()
+        self.genres = sorted(genres)
+        self.mean = total / count
+        self.scale = np.sqrt(squares / count - self.mean ** 2).replace(0, 1)
+
+    # Dense float32 features of one chunk; missing numbers become the mean (0)
+    def features(self, chunk):
+        numeric = ((numeric_features(chunk) - self.mean) / self.scale).fillna(0)
+        genres = chunk['Genres'].reset_index(drop=True).str.split(';').explode()
+        codes = pd.Index(self.genres).get_indexer(genres)
+        multi_hot = np.zeros((len(chunk), len(self.genres)), dtype=np.float32)
+        present = codes >= 0
+        multi_hot[genres.index[present], codes[present]] = 1
+        return np.hstack([numeric.to_numpy(dtype=np.float32), multi_hot])
+
+    # One row per cluster: size, share, typical values and the dominant genre/category
+    def profiles(self):
+        df = self.apps_df.assign(Cluster=self.labels)
+        grouped = df.groupby('Cluster')
+        profiles = pd.DataFrame({
+            'Apps': grouped.size(),
+            'Mean Rating': grouped['Rating'].mean(),
+            'Median Reviews': grouped['Reviews'].median(),
+            'Median Installs': grouped['Installs'].median(),
+            'Median Size': grouped['Size'].median(),
+            'Mean Price': grouped['Price'].mean(),
+            'Paid Share': grouped['Type'].apply(lambda types: (types == 'Paid').mean()),
+            'Top Genre': grouped['Genres'].agg(lambda genres: genres.value_counts().index[0]),
+            'Top Category': grouped['Category'].agg(lambda categories: categories.value_counts().index[0]),
+        })
+        profiles['Share'] = profiles['Apps'] / len(df)
+        return profiles.reset_index()
+
+    # Top apps of one cluster by a metric
+    def top_apps(self, cluster, n=10, by='Installs'):
+        members = self.apps_df[self.labels == cluster]
+        return members.sort_values(by=by, ascending=False, kind='stable').head(n)
@@ -0,0 +1,74 @@
+import atexit
+import copy
+import pickle
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from data_pipeline import dataset_version, load_apps
+from parallel_agg import SharedFrame
+
+# Length prefix of the pickled metadata block; zero means "not written yet"
+_HEADER = struct.Struct('<Q')
+
+
+# Well-known name of the metadata block for one dataset version. Every
+# dashboard process on the host derives the same name from the same CSV.
+def _meta_name(version):
+    return 'gplay_apps_%s' % version
+
+
+# Copy the cleaned frame into shared memory and publish its layout (plus
+# the sketches) under the version's well-known name. The publishing process
+# unlinks everything on exit; processes already attached keep their mapping.
+def publish_dataset(dataset):
+    frame = dataset.apps_df.reset_index(names='_index')
+    shared = SharedFrame.from_frame(frame, columns=list(frame.columns))
+    meta = copy.copy(dataset)
+    meta.apps_df = None
+    payload = pickle.dumps({'spec': shared.spec, 'dataset': meta})
+    try:
+        block = shared_memory.SharedMemory(name=_meta_name(dataset.version), create=True,
+                                           size=_HEADER.size + len(payload))
+    except FileExistsError:
+        # Another worker won the race; keep using our own copy
+        shared.unlink()
+        return None
+    block.buf[_HEADER.size:_HEADER.size + len(payload)] = payload
+    _HEADER.pack_into(block.buf, 0, len(payload))
+    shared.blocks[block.name] = block
+    atexit.register(shared.unlink)
+    return shared
+
+
+# Rebuild the dataset from a published version without copying the columns,
+# or return None when nothing (complete) has been published yet
+def attach_dataset(version):
+    try:
+        block = shared_memory.SharedMemory(name=_meta_name(version))
+    except FileNotFoundError:
+        return None
+    resource_tracker.unregister(block._name, 'shared_memory')
+    (length,) = _HEADER.unpack_from(block.buf, 0)
+    if length == 0:
+        block.close()
+        return None
+    meta = pickle.loads(block.buf[_HEADER.size:_HEADER.size + length])
+    block.close()
+
+    shared = SharedFrame.attach(meta['spec'], track=False)
+    dataset = meta['dataset']
+    dataset.apps_df = shared.to_frame().set_index('_index').rename_axis(None)
+    # Keep the mapping alive for as long as the dataset is
+    dataset._shared = shared
+    return dataset
+
+
+# Load the dataset once per host: attach to the copy another dashboard
+# worker published, or load the CSV and publish it for the others
+def load_shared_apps(path='googleplaystore.csv'):
+    version = dataset_version(path)
+    dataset = attach_dataset(version)
+    if dataset is None:
+        dataset = load_apps(path)
+        dataset._shared = publish_dataset(dataset)
+    return dataset
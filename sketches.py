@@ -0,0 +1,337 @@
+import numpy as np
+import pandas as pd
+
+
+# KLL quantile sketch: a stack of compactors where an item stored at level i
+# stands in for 2**i raw values. Sketches built on separate chunks or
+# partitions can be merged, and quantile queries have bounded rank error
+# (roughly 1.7 / k of the total count) no matter how many values went in.
+class KLLSketch:
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so the weights still add up
+                leftover = items[:items.size % 2]
+                items = items[items.size % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Adding a level shrinks the capacity of the ones below it
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += values.size
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(lvl.size, 2 ** i) for i, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        return items[np.minimum(ranks, items.size - 1)]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+# One KLL sketch per numeric column, overall and per group (e.g. Category).
+# update() is fed chunk by chunk during ingestion and merge() combines the
+# state of separately ingested partitions.
+class ColumnSketches:
+    def __init__(self, columns, by=None, k=200):
+        self.columns = list(columns)
+        self.by = by
+        self.k = k
+        self.overall = {col: KLLSketch(k) for col in self.columns}
+        self.groups = {}
+
+    def _group(self, key):
+        if key not in self.groups:
+            self.groups[key] = {col: KLLSketch(self.k) for col in self.columns}
+        return self.groups[key]
+
+    def update(self, df):
+        values = {col: pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float) for col in self.columns}
+        for col in self.columns:
+            self.overall[col].update(values[col])
+        if self.by is not None:
+            for key, idx in df.groupby(self.by, sort=False).indices.items():
+                sketches = self._group(key)
+                for col in self.columns:
+                    sketches[col].update(values[col][idx])
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.overall[col].merge(other.overall[col])
+        for key, sketches in other.groups.items():
+            mine = self._group(key)
+            for col in self.columns:
+                mine[col].merge(sketches[col])
+        return self
+
+    def quantile(self, column, q, group=None):
+        sketches = self.overall if group is None else self.groups[group]
+        return sketches[column].quantile(q)
+
+    def median(self, column, group=None):
+        return self.quantile(column, 0.5, group)
+
+    # Long-format table of the requested percentiles for every group, e.g.
+    # Category | Column | p10 | p50 | p90
+    def percentile_bands(self, qs=(0.1, 0.5, 0.9)):
+        names = ['p%d' % round(q * 100) for q in qs]
+        rows = []
+        for key in sorted(self.groups):
+            for col in self.columns:
+                values = self.groups[key][col].quantiles(qs)
+                rows.append([key, col] + list(values))
+        return pd.DataFrame(rows, columns=[self.by, 'Column'] + names)
+
+
+# 64-bit hashes of arbitrary column values (strings, numbers), vectorized
+def hash_values(values):
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+# Number of significant bits of each uint64, computed without float rounding
+def _bit_length(x):
+    x = x.copy()
+    n = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        n[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    return n + (x > 0)
+
+
+# HyperLogLog distinct counter: 2**p one-byte registers (4 KB at p=12) and a
+# relative standard error of about 1.04 / sqrt(2**p). Merging takes the
+# register-wise maximum.
+class HyperLogLog:
+    def __init__(self, p=12):
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def update(self, values):
+        return self.update_hashes(hash_values(values))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+# Count-Min sketch: depth rows of width counters; a value's estimate is the
+# minimum over its counters and never undercounts.
+class CountMinSketch:
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, values):
+        hashes = hash_values(values)
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = hashes >> np.uint64(32)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((low[None, :] + rows * high[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def update_counts(self, counts):
+        columns = self._columns(counts.index)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts.to_numpy(dtype=np.int64))
+        return self
+
+    def update(self, values):
+        return self.update_counts(pd.Series(values).value_counts())
+
+    def merge(self, other):
+        self.table += other.table
+        return self
+
+    def estimate(self, values):
+        columns = self._columns(values)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+
+# Space-Saving heavy hitters: at most `capacity` counters, each an
+# overestimate by no more than the smallest counter. Chunks are folded in as
+# exact value counts, so a chunk costs one vectorized value_counts(). The
+# counters are a plain dict, largest first: a frame has one of these per
+# dimension value and companion column, and pandas overhead on every fold
+# dominated both updates and merges.
+class SpaceSaving:
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._counts = {}
+
+    @property
+    def counts(self):
+        return pd.Series(list(self._counts.values()), index=list(self._counts), dtype=np.int64)
+
+    def _floor(self):
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+    # Add `counts` (a dict) whose absent keys count as `floor`; ties keep
+    # the labels in sorted order
+    def _fold(self, counts, floor):
+        mine, own_floor = self._counts, self._floor()
+        keys = sorted(mine.keys() | counts.keys())
+        combined = [(mine.get(key, own_floor) + counts.get(key, floor), key) for key in keys]
+        combined.sort(key=lambda item: item[0], reverse=True)
+        self._counts = {key: count for count, key in combined[:self.capacity]}
+        return self
+
+    # Fold in exact counts, a Series or a dict of value -> count
+    def update_counts(self, counts):
+        if isinstance(counts, pd.Series):
+            counts = dict(zip(counts.index, counts.to_numpy().tolist()))
+        return self._fold(counts, 0)
+
+    def update(self, values):
+        return self.update_counts(pd.Series(values).value_counts())
+
+    def merge(self, other):
+        return self._fold(other._counts, other._floor())
+
+    def top(self, n=None):
+        return self.counts if n is None else self.counts.head(n)
+
+    def most_common(self, default='Unknown'):
+        return next(iter(self._counts), default)
+
+
+# Frequency summaries per dimension column (Category, Genres, ...):
+#   - heavy hitters and a Count-Min sketch of how often each value occurs
+#   - per value, a HyperLogLog of distinct apps
+#   - per value, heavy hitters of companion columns ("most common Type")
+# Everything is updated chunk by chunk and merges across partitions.
+class FrequencySketches:
+    def __init__(self, dimensions, key='App', capacity=256):
+        # dimensions maps each dimension column to its companion columns
+        self.dimensions = {dim: list(companions) for dim, companions in dimensions.items()}
+        self.key = key
+        self.capacity = capacity
+        self.heavy = {dim: SpaceSaving(capacity) for dim in self.dimensions}
+        self.cms = {dim: CountMinSketch() for dim in self.dimensions}
+        self.distinct = {dim: {} for dim in self.dimensions}
+        self.companions = {dim: {} for dim in self.dimensions}
+
+    def _companion(self, dim, value, column):
+        per_value = self.companions[dim].setdefault(value, {})
+        if column not in per_value:
+            per_value[column] = SpaceSaving(self.capacity)
+        return per_value[column]
+
+    def update(self, df):
+        key_hashes = hash_values(df[self.key])
+        for dim, companions in self.dimensions.items():
+            counts = df[dim].value_counts()
+            self.heavy[dim].update_counts(counts)
+            self.cms[dim].update_counts(counts)
+
+            for value, idx in df.groupby(dim, sort=False).indices.items():
+                self.distinct[dim].setdefault(value, HyperLogLog()).update_hashes(key_hashes[idx])
+
+            for column in companions:
+                pairs = df.groupby([dim, column], sort=False).size()
+                per_value = {}
+                for (value, other), count in zip(pairs.index, pairs.to_numpy().tolist()):
+                    per_value.setdefault(value, {})[other] = count
+                for value, counts in per_value.items():
+                    self._companion(dim, value, column).update_counts(counts)
+        return self
+
+    def merge(self, other):
+        for dim in self.dimensions:
+            self.heavy[dim].merge(other.heavy[dim])
+            self.cms[dim].merge(other.cms[dim])
+            for value, hll in other.distinct[dim].items():
+                self.distinct[dim].setdefault(value, HyperLogLog()).merge(hll)
+            for value, per_value in other.companions[dim].items():
+                for column, summary in per_value.items():
+                    self._companion(dim, value, column).merge(summary)
+        return self
+
+    def estimate(self, dim, values):
+        return self.cms[dim].estimate(values)
+
+    def distinct_apps(self, dim, value):
+        hll = self.distinct[dim].get(value)
+        return hll.count() if hll is not None else 0
+
+    def most_common(self, dim, value, column, default='Unknown'):
+        summary = self.companions[dim].get(value, {}).get(column)
+        return summary.most_common(default) if summary is not None else default
+
+    # Frequency table of the top values of a dimension, with distinct-app
+    # estimates and the most common value of each requested companion column
+    def frequencies(self, dim, n=None, companions=()):
+        top = self.heavy[dim].top(n)
+        table = pd.DataFrame({dim: top.index, 'Frequency': top.to_numpy()})
+        table['Distinct_Apps'] = [self.distinct_apps(dim, value) for value in table[dim]]
+        for column in companions:
+            table['Most_Common_' + column.replace(' ', '_')] = [
+                self.most_common(dim, value, column) for value in table[dim]
+            ]
+        return table
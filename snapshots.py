@@ -0,0 +1,119 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import load_apps
+
+# Columns compared between two snapshots of the store
+DIFF_COLUMNS = ['Installs Tier', 'Rating', 'Reviews', 'Size', 'Price']
+
+# Dated snapshot files carry their date in the name, e.g. googleplaystore_2018-08-08.csv
+_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+
+# One dated dump of the store, reduced to one row per app (the App name is
+# the key). When a dump lists an app more than once the row with the most
+# reviews, i.e. the most recent crawl, is kept. Ratings flagged in
+# `rating_imputed` are the loader's fill value, not data, and are set back to
+# NaN so they never show up as changes.
+class Snapshot:
+    def __init__(self, date, apps_df, version=None, rating_imputed=None):
+        self.date = pd.Timestamp(date)
+        self.version = version
+        if rating_imputed is not None and rating_imputed.any():
+            apps_df = apps_df.assign(Rating=apps_df['Rating'].mask(rating_imputed))
+        # Only the (few) repeated apps need sorting
+        repeated = apps_df['App'].duplicated(keep=False).to_numpy()
+        latest = apps_df[repeated].sort_values(by='Reviews', ascending=False, kind='stable')
+        drop = latest.index[latest['App'].duplicated().to_numpy()]
+        keep = ~repeated
+        keep[repeated] = ~apps_df.index[repeated].isin(drop)
+        self.apps_df = apps_df[keep].reset_index(drop=True)
+
+
+# Load a dump as a snapshot; without a date in the file name it is dated by
+# its latest 'Last Updated'
+def load_snapshot(path, date=None, dataset=None):
+    dataset = dataset or load_apps(path)
+    if date is None:
+        match = _DATE.search(os.path.basename(path))
+        date = match.group(1) if match else dataset.apps_df['Last Updated'].max()
+    return Snapshot(date, dataset.apps_df, dataset.version, dataset.rating_imputed)
+
+
+# Dated snapshot files in a directory, oldest first
+def find_snapshots(directory='snapshots'):
+    paths = [path for path in glob.glob(os.path.join(directory, '*.csv')) if _DATE.search(os.path.basename(path))]
+    return sorted(paths, key=lambda path: _DATE.search(os.path.basename(path)).group(1))
+
+
+# Per-app changes between two snapshots: matched apps with before/after/delta
+# columns, plus the apps only present in one of them
+class SnapshotDiff:
+    def __init__(self, before, after, changes, new_apps, removed_apps):
+        self.before = before
+        self.after = after
+        self.changes = changes
+        self.new_apps = new_apps
+        self.removed_apps = removed_apps
+
+    def summary(self):
+        changed = (self.changes[[column + ' Delta' for column in DIFF_COLUMNS]].fillna(0) != 0).any(axis=1)
+        return {'matched': len(self.changes), 'changed': int(changed.sum()),
+                'new': len(self.new_apps), 'removed': len(self.removed_apps)}
+
+    # Apps whose value of `column` moved the most, up (largest=True) or down
+    def movers(self, column, n=10, largest=True):
+        delta = self.changes[column + ' Delta']
+        moved = self.changes[delta.notna() & (delta != 0)]
+        moved = moved.sort_values(by=column + ' Delta', ascending=not largest, kind='stable')
+        return moved[['App', 'Category', column + ' Before', column + ' After', column + ' Delta']].head(n)
+
+    # Apps that moved between install tiers, counted by (before, after) tier
+    def tier_transitions(self):
+        moved = self.changes[self.changes['Installs Tier Delta'] != 0]
+        counts = moved.groupby(['Installs Tier Before', 'Installs Tier After']).size()
+        return counts.rename('Apps').reset_index()
+
+
+# Hash join of two snapshots on the App name, with vectorized deltas. One
+# factorize over both key columns maps every name to a dense code, so the
+# probe side is a plain array lookup.
+def diff_snapshots(before, after):
+    names = pd.concat([before.apps_df['App'], after.apps_df['App']], ignore_index=True)
+    codes, uniques = pd.factorize(names)
+    position = np.full(len(uniques), -1, dtype=np.int64)
+    position[codes[:len(before.apps_df)]] = np.arange(len(before.apps_df))
+    indexer = position[codes[len(before.apps_df):]]
+
+    matched = indexer >= 0
+    after_rows = np.flatnonzero(matched)
+    before_rows = indexer[matched]
+    removed = np.ones(len(before.apps_df), dtype=bool)
+    removed[before_rows] = False
+
+    changes = {'App': after.apps_df['App'].array.take(after_rows),
+               'Category': after.apps_df['Category'].array.take(after_rows)}
+    for column in DIFF_COLUMNS:
+        old = before.apps_df[column].to_numpy()[before_rows]
+        new = after.apps_df[column].to_numpy()[after_rows]
+        changes[column + ' Before'] = old
+        changes[column + ' After'] = new
+        # Integer deltas in int64 so int8 tier codes cannot wrap
+        changes[column + ' Delta'] = np.subtract(new, old, dtype=np.float64 if old.dtype.kind == 'f' else np.int64)
+    return SnapshotDiff(before.date, after.date, pd.DataFrame(changes),
+                        after.apps_df[~matched].reset_index(drop=True),
+                        before.apps_df[removed].reset_index(drop=True))
+
+
+# Value of `column` for the given apps in every snapshot, as a long frame
+# (App, Date, column); apps missing from a snapshot are left out of it
+def app_history(snapshots, apps, column):
+    frames = []
+    for snapshot in sorted(snapshots, key=lambda snapshot: snapshot.date):
+        rows = snapshot.apps_df.loc[snapshot.apps_df['App'].isin(apps), ['App', column]]
+        frames.append(rows.assign(Date=snapshot.date)[['App', 'Date', column]])
+    return pd.concat(frames, ignore_index=True)
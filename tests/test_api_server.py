@@ -0,0 +1,62 @@
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from api_server import make_server
+from data_pipeline import load_apps
+from queries import PandasBackend
+
+
+@pytest.fixture(scope='module')
+def server():
+    dataset = load_apps('googleplaystore.csv')
+    server = make_server(dataset, PandasBackend(dataset.apps_df), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, **headers):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port)
+    try:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
+    finally:
+        connection.close()
+
+
+def test_top_returns_json_with_an_etag(server):
+    response, body = get(server, '/api/top?metric=Installs&n=5&Type=Paid')
+    assert response.status == 200 and response.getheader('Content-Type') == 'application/json'
+    assert response.getheader('ETag')
+    assert len(json.loads(body)) == 5
+
+
+def test_matching_if_none_match_gets_an_empty_304(server):
+    response, _ = get(server, '/api/free-paid')
+    etag = response.getheader('ETag')
+    response, body = get(server, '/api/free-paid', **{'If-None-Match': etag})
+    assert response.status == 304 and body == b'' and response.getheader('ETag') == etag
+    response, _ = get(server, '/api/free-paid', **{'If-None-Match': '"other"'})
+    assert response.status == 200
+
+
+def test_gzip_only_when_accepted(server):
+    plain, plain_body = get(server, '/api/installs?by=Category')
+    zipped, zipped_body = get(server, '/api/installs?by=Category', **{'Accept-Encoding': 'gzip'})
+    assert plain.getheader('Content-Encoding') is None
+    assert zipped.getheader('Content-Encoding') == 'gzip' and zipped.getheader('Vary') == 'Accept-Encoding'
+    assert gzip.decompress(zipped_body) == plain_body
+    assert zipped.getheader('ETag') == plain.getheader('ETag')
+
+
+def test_bad_requests(server):
+    assert get(server, '/api/nope')[0].status == 404
+    assert get(server, '/api/top?metric=Installs&n=100000')[0].status == 400
+    assert get(server, '/api/installs?by=App')[0].status == 400
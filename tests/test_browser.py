@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from browser import DatasetBrowser
+
+
+def browser():
+    return DatasetBrowser(pd.DataFrame({
+        'App': ['Bravo', 'alpha', 'Charlie', 'Delta', 'Echo', 'Foxtrot'],
+        'Category': ['GAME', 'TOOLS', 'GAME', 'TOOLS', 'GAME', 'GAME'],
+        'Rating': [4.0, np.nan, 3.0, 4.0, np.nan, 3.0],
+    }))
+
+
+def test_order_puts_missing_values_last_with_stable_ties():
+    assert list(browser().order('Rating')) == [2, 5, 0, 3, 1, 4]
+    assert list(browser().order('Rating', ascending=False)) == [0, 3, 2, 5, 1, 4]
+
+
+def test_positions_filter_and_search_keep_the_sort_order():
+    assert list(browser().positions('Rating', filters={'Category': 'GAME'})) == [2, 5, 0, 4]
+    assert list(browser().positions('Rating', ascending=False, search='A')) == [0, 3, 2, 1]
+    assert list(browser().positions(search='zulu')) == []
+
+
+def test_page_slices_the_matching_rows():
+    rows, matching = browser().page(1, 2, sort_by='Rating', filters={'Category': 'GAME'})
+    assert matching == 4 and list(rows['App']) == ['Bravo', 'Echo']
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.backend_compare import QUERIES, label
+from data_pipeline import load_apps
+from queries import PandasBackend, ParallelBackend, SQLiteBackend
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return load_apps('googleplaystore.csv')
+
+
+@pytest.fixture(scope='module')
+def expected(dataset):
+    backend = PandasBackend(dataset.apps_df)
+    return {label(*query): getattr(backend, query[0])(*query[1], **query[2]) for query in QUERIES}
+
+
+@pytest.mark.parametrize('query', QUERIES, ids=[label(*query) for query in QUERIES])
+def test_sqlite_matches_pandas(dataset, expected, tmp_path_factory, query):
+    path = str(tmp_path_factory.getbasetemp() / 'apps.sqlite')
+    backend = SQLiteBackend.from_frame(dataset.apps_df, path, version=dataset.version)
+    name, args, kwargs = query
+    pd.testing.assert_frame_equal(getattr(backend, name)(*args, **kwargs), expected[label(*query)], check_exact=False)
+
+
+def test_parallel_matches_pandas(dataset, expected):
+    backend = ParallelBackend(dataset.apps_df, workers=2)
+    try:
+        for name, args, kwargs in QUERIES:
+            pd.testing.assert_frame_equal(getattr(backend, name)(*args, **kwargs), expected[label(name, args, kwargs)],
+                                          check_exact=False)
+    finally:
+        backend.close()
+
+
+def test_sqlite_file_is_rebuilt_only_for_a_new_version(dataset, tmp_path):
+    path = str(tmp_path / 'apps.sqlite')
+    SQLiteBackend.from_frame(dataset.apps_df, path, version='one')
+    built = os.stat(path).st_mtime_ns
+    assert SQLiteBackend.from_frame(dataset.apps_df, path, version='one').version() == 'one'
+    assert os.stat(path).st_mtime_ns == built
+    assert SQLiteBackend.from_frame(dataset.apps_df.head(100), path, version='two').version() == 'two'
+    assert os.listdir(tmp_path) == ['apps.sqlite']
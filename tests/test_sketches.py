@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from sketches import ColumnSketches, CountMinSketch, HyperLogLog, KLLSketch, SpaceSaving
+
+
+def rank_error(sketch, values, q):
+    return abs((values <= sketch.quantile(q)).mean() - q)
+
+
+def test_kll_quantiles_within_rank_error():
+    values = np.random.default_rng(0).lognormal(size=200_000)
+    sketch = KLLSketch(k=200).update(values)
+    assert sketch.count == values.size
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        assert rank_error(sketch, values, q) < 0.02
+
+
+def test_kll_merge_matches_single_pass():
+    values = np.random.default_rng(1).normal(size=100_000)
+    merged = KLLSketch()
+    for part in np.array_split(values, 7):
+        merged.merge(KLLSketch().update(part))
+    assert merged.count == values.size
+    assert rank_error(merged, values, 0.5) < 0.02
+
+
+def test_kll_ignores_missing_values():
+    sketch = KLLSketch().update([1.0, np.nan, 3.0, 2.0])
+    assert sketch.count == 3 and sketch.median() == 2.0
+    assert np.isnan(KLLSketch().median())
+
+
+def test_column_sketches_per_group():
+    df = pd.DataFrame({'Category': ['A'] * 500 + ['B'] * 500, 'Rating': np.r_[np.full(500, 2.0), np.full(500, 4.0)]})
+    sketches = ColumnSketches(['Rating'], by='Category').update(df)
+    assert sketches.median('Rating', 'A') == 2.0 and sketches.median('Rating', 'B') == 4.0
+    bands = sketches.percentile_bands()
+    assert list(bands['Category']) == ['A', 'B'] and list(bands.columns) == ['Category', 'Column', 'p10', 'p50', 'p90']
+
+
+def test_hyperloglog_distinct_count():
+    hll = HyperLogLog()
+    hll.update(pd.Series(['app %d' % (i % 20_000) for i in range(60_000)]))
+    assert abs(hll.count() - 20_000) / 20_000 < 0.05
+
+
+def test_count_min_never_underestimates():
+    values = pd.Series(['a'] * 1000 + ['b'] * 10 + ['c%d' % i for i in range(5000)])
+    cms = CountMinSketch()
+    cms.update(values)
+    estimates = cms.estimate(['a', 'b'])
+    assert estimates[0] >= 1000 and estimates[1] >= 10
+
+
+def test_space_saving_finds_heavy_hitters():
+    values = pd.Series(['big'] * 5000 + ['medium'] * 2000 + ['tail %d' % i for i in range(3000)])
+    heavy = SpaceSaving(capacity=64)
+    for part in np.array_split(values.sample(frac=1, random_state=0), 10):
+        heavy.update(part)
+    top = heavy.top(2)
+    assert list(top.index) == ['big', 'medium']
+    assert top['big'] >= 5000 and top['medium'] >= 2000
@@ -0,0 +1,87 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline import clean_chunk, load_apps
+from validation import validate_chunk
+
+HEADER = 'App,Category,Rating,Reviews,Size,Installs,Type,Price,Content Rating,Genres,Last Updated,Current Ver,Android Ver\n'
+GOOD = 'Good App,TOOLS,4.1,159,19M,"10,000+",Free,0,Everyone,Tools,"January 7, 2018",1.0,4.0 and up\n'
+
+
+def chunk_of(*rows):
+    return pd.read_csv(io.StringIO(HEADER + ''.join(rows)), dtype=str)
+
+
+def with_field(column, value):
+    chunk = chunk_of(GOOD)
+    chunk[column] = value
+    return chunk
+
+
+def reasons(chunk):
+    _, quarantine, _ = validate_chunk(chunk)
+    return list(quarantine['Reason'])
+
+
+def test_good_row_passes():
+    valid, quarantine, counts = validate_chunk(chunk_of(GOOD))
+    assert len(valid) == 1 and len(quarantine) == 0 and counts.sum() == 0
+
+
+def test_unparseable_dates_are_quarantined():
+    for value in ['Sept 3, 2018', 'Foo 45, 2018', 'February 30, 2018']:
+        assert reasons(with_field('Last Updated', value)) == ['last_updated_format']
+
+
+def test_reviews_must_fit_int64():
+    assert reasons(with_field('Reviews', '9223372036854775807')) == []
+    assert reasons(with_field('Reviews', '0009223372036854775807')) == []
+    for value in ['9223372036854775808', '12345678901234567890123', '3.0M']:
+        assert reasons(with_field('Reviews', value)) == ['reviews_format']
+
+
+def test_installs_must_be_a_store_tier():
+    for value in ['0', '0+', '5+', '1,000,000,000+']:
+        assert reasons(with_field('Installs', value)) == []
+    for value in ['7,000+', '2+', 'Free']:
+        assert reasons(with_field('Installs', value)) == ['installs_format']
+
+
+def test_missing_reviews_or_installs_are_quarantined():
+    assert reasons(chunk_of(GOOD.replace(',159,', ',,'))) == ['missing_required']
+    assert reasons(chunk_of(GOOD.replace('"10,000+"', ''))) == ['missing_required']
+
+
+def test_one_reason_per_broken_field():
+    chunk = with_field('Reviews', '12345678901234567890123')
+    chunk['Last Updated'] = 'Sept 3, 2018'
+    assert reasons(chunk) == ['reviews_format;last_updated_format']
+
+
+def test_clean_chunk_converts_kilobytes_to_megabytes():
+    chunk = chunk_of(GOOD, GOOD.replace('Good App', 'Small App').replace('19M', '512k'),
+                     GOOD.replace('Good App', 'Any Size').replace('19M', 'Varies with device'))
+    valid, _, _ = validate_chunk(chunk)
+    size = clean_chunk(valid.copy())['Size']
+    assert size.iloc[0] == 19.0 and size.iloc[1] == 0.5 and np.isnan(size.iloc[2])
+
+
+def test_load_apps_quarantines_malformed_rows(tmp_path):
+    rows = [GOOD,
+            GOOD.replace('Good App', 'Bad Month').replace('January 7', 'Sept 3'),
+            GOOD.replace('Good App', 'Bad Day').replace('January 7', 'Foo 45'),
+            GOOD.replace('Good App', 'Huge Reviews').replace(',159,', ',12345678901234567890123,'),
+            GOOD.replace('Good App', 'Odd Installs').replace('10,000+', '7,000+'),
+            GOOD.replace('Good App', 'No Reviews').replace(',159,', ',,'),
+            GOOD.replace('Good App', 'No Installs').replace('"10,000+"', '')]
+    path = tmp_path / 'apps.csv'
+    path.write_text(HEADER + ''.join(rows))
+    for chunksize in (None, 2):
+        dataset = load_apps(str(path), chunksize=chunksize)
+        assert list(dataset.apps_df['App']) == ['Good App']
+        assert dict(zip(dataset.quarantine['App'], dataset.quarantine['Reason'])) == {
+            'Bad Month': 'last_updated_format', 'Bad Day': 'last_updated_format',
+            'Huge Reviews': 'reviews_format', 'Odd Installs': 'installs_format',
+            'No Reviews': 'missing_required', 'No Installs': 'missing_required'}
@@ -0,0 +1,68 @@
+import gc
+
+import numpy as np
+
+import instrumentation
+from view_cache import ViewCache
+
+
+# 1000-byte views, in a cache with room for three of them
+def view():
+    return np.zeros(125)
+
+
+def cache_of_three():
+    return ViewCache(budget_mb=3000 / 2 ** 20)
+
+
+def counter(name):
+    return instrumentation.snapshot()['counters'].get(name, 0)
+
+
+def test_hits_reuse_the_computed_value():
+    cache = cache_of_three()
+    computed = []
+    first = cache.get('a', 1, {'n': [1, 2]}, lambda: computed.append(1) or view())
+    again = cache.get('a', 1, {'n': (1, 2)}, lambda: computed.append(1) or view())
+    assert again is first and computed == [1]
+
+
+def test_least_recently_used_view_is_evicted_past_the_budget():
+    cache = cache_of_three()
+    for name in 'abc':
+        cache.get(name, 1, None, view)
+    assert len(cache) == 3 and cache.nbytes == 3000
+    cache.get('a', 1, None, view)
+    cache.get('d', 1, None, view)
+    assert len(cache) == 3 and cache.nbytes == 3000
+    computed = []
+    for name in 'acd':
+        cache.get(name, 1, None, lambda: computed.append(name) or view())
+    assert computed == []
+    cache.get('b', 1, None, lambda: computed.append('b') or view())
+    assert computed == ['b']
+
+
+def test_views_larger_than_the_budget_are_not_kept():
+    cache = cache_of_three()
+    cache.get('big', 1, None, lambda: np.zeros(1000))
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_new_version_drops_older_entries():
+    cache = cache_of_three()
+    cache.get('a', 1, None, view)
+    cache.get('b', 1, None, view)
+    cache.get('a', 2, None, view)
+    assert len(cache) == 1 and cache.nbytes == 1000
+
+
+def test_bytes_are_released_when_the_cache_is_collected():
+    held = counter('view_cache.bytes')
+    sessions = counter('view_cache.sessions')
+    cache = cache_of_three()
+    cache.get('a', 1, None, view)
+    assert counter('view_cache.bytes') == held + 1000 and counter('view_cache.sessions') == sessions + 1
+    del cache
+    gc.collect()
+    assert counter('view_cache.bytes') == held and counter('view_cache.sessions') == sessions
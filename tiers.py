@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from data_pipeline import INSTALL_TIER_LABELS, INSTALL_TIER_UPPER, INSTALL_TIERS
+
+# Dimensions whose group codes are computed up front
+TIER_DIMENSIONS = ['Category', 'Genres', 'Type', 'Content Rating']
+
+# Rating bands for the tier x rating cross-tab, as [lower, upper) edges;
+# the last band includes 5.0
+RATING_BANDS = [1, 2, 3, 3.5, 4, 4.5, 5]
+RATING_BAND_LABELS = ['1-2', '2-3', '3-3.5', '3.5-4', '4-4.5', '4.5-5']
+
+
+# Install-tier aggregations over the int8 'Installs Tier' codes. The group
+# codes of every dimension and the rating bands are computed once; after
+# that each aggregation is a single bincount over small integers instead of
+# a group-by on strings summing int64 installs.
+class InstallTiers:
+    def __init__(self, apps_df, dimensions=TIER_DIMENSIONS):
+        self.tiers = apps_df['Installs Tier'].to_numpy().astype(np.int64)
+        self.codes, self.labels = {}, {}
+        for by in dimensions:
+            codes, labels = pd.factorize(apps_df[by], sort=True)
+            self.codes[by], self.labels[by] = codes.astype(np.int64), list(labels)
+        self.bands = np.searchsorted(RATING_BANDS[1:-1], apps_df['Rating'].to_numpy(), side='right')
+
+    # Apps per (group, tier); rows are the groups of `by` (or a single 'All'
+    # row), columns the tier labels
+    def counts(self, by=None):
+        n_tiers = len(INSTALL_TIERS)
+        if by is None:
+            counts = np.bincount(self.tiers, minlength=n_tiers)[None, :]
+            labels = ['All']
+        else:
+            codes, labels = self.codes[by], self.labels[by]
+            present = codes >= 0
+            counts = np.bincount(codes[present] * n_tiers + self.tiers[present], minlength=len(labels) * n_tiers)
+        return pd.DataFrame(counts.reshape(len(labels), n_tiers), index=pd.Index(labels, name=by or 'Group'),
+                            columns=INSTALL_TIER_LABELS)
+
+    # Total installs per group as a bounded range: the sum of every app's
+    # tier lower bound and of its upper bound
+    def installs_range(self, by):
+        counts = self.counts(by)
+        matrix = counts.to_numpy()
+        ranges = pd.DataFrame({'Apps': matrix.sum(axis=1), 'Installs Low': matrix @ INSTALL_TIERS,
+                               'Installs High': matrix @ INSTALL_TIER_UPPER}, index=counts.index)
+        return ranges.sort_values(by='Installs Low', ascending=False, kind='stable').reset_index()
+
+    # Share of each group's apps in every tier, optionally for the largest groups only
+    def distribution(self, by, top=None):
+        counts = self.counts(by)
+        if top is not None:
+            counts = counts.loc[counts.sum(axis=1).nlargest(top).index]
+        return counts.div(counts.sum(axis=1), axis=0)
+
+    # Apps per install tier (rows) and rating band (columns)
+    def rating_crosstab(self):
+        n_bands = len(RATING_BAND_LABELS)
+        counts = np.bincount(self.tiers * n_bands + self.bands, minlength=len(INSTALL_TIERS) * n_bands)
+        crosstab = pd.DataFrame(counts.reshape(len(INSTALL_TIERS), n_bands),
+                                index=pd.Index(INSTALL_TIER_LABELS, name='Installs Tier'), columns=RATING_BAND_LABELS)
+        return crosstab.rename_axis(columns='Rating Band')
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Columns every row needs; a missing value sends the row to quarantine
+REQUIRED_COLUMNS = ['App', 'Category', 'Reviews', 'Installs', 'Type', 'Content Rating', 'Current Ver', 'Android Ver']
+
+TYPES = {'Free', 'Paid'}
+CONTENT_RATINGS = {'Everyone', 'Everyone 10+', 'Teen', 'Mature 17+', 'Adults only 18+', 'Unrated'}
+
+# Lower bounds of the store's install tiers: '0', '1+', '5+', '10+', ... '1,000,000,000+'
+INSTALL_TIERS = np.array([0] + [m * 10 ** e for e in range(9) for m in (1, 5)] + [10 ** 9], dtype=np.int64)
+
+LAST_UPDATED_FORMAT = '%B %d, %Y'
+
+# Largest Reviews count that still fits the int64 column, as text
+INT64_MAX = str(np.iinfo(np.int64).max)
+
+
+# Each rule takes the raw (text) chunk and returns a boolean mask of the rows
+# that break it. Missing values only fail 'missing_required' so that one bad
+# field gives one reason code.
+def _missing_required(chunk):
+    return chunk[REQUIRED_COLUMNS].isna().any(axis=1)
+
+
+def _format(column, pattern):
+    def rule(chunk):
+        values = chunk[column]
+        return values.notna() & ~values.str.fullmatch(pattern, na=False)
+    return rule
+
+
+def _domain(column, allowed):
+    def rule(chunk):
+        values = chunk[column]
+        return values.notna() & ~values.isin(allowed)
+    return rule
+
+
+# Non-negative integers that fit in int64
+def _reviews(chunk):
+    values = chunk['Reviews']
+    digits = values.str.fullmatch(r'\d+', na=False)
+    significant = values.where(digits, '0').str.lstrip('0')
+    length = significant.str.len()
+    fits = (length < len(INT64_MAX)) | ((length == len(INT64_MAX)) & (significant <= INT64_MAX))
+    return values.notna() & ~(digits & fits)
+
+
+# Install counts written like '1,000+' whose number is one of the store's tiers
+def _installs(chunk):
+    values = chunk['Installs']
+    shaped = values.str.fullmatch(r'\d{1,3}(,\d{3})*\+?', na=False)
+    counts = pd.to_numeric(values.where(shaped).str.replace(',', '').str.rstrip('+'), errors='coerce')
+    return values.notna() & ~(shaped & counts.isin(INSTALL_TIERS))
+
+
+# Dates the cleaning step can parse; 'Sept 3, 2018' or 'Foo 45, 2018' fail
+def _last_updated(chunk):
+    values = chunk['Last Updated']
+    return values.notna() & pd.to_datetime(values, format=LAST_UPDATED_FORMAT, errors='coerce').isna()
+
+
+def _rating_range(chunk):
+    rating = pd.to_numeric(chunk['Rating'], errors='coerce')
+    return chunk['Rating'].notna() & ~rating.between(1, 5)
+
+
+# Reason code -> vectorized check, in the order codes are reported
+RULES = {
+    'missing_required': _missing_required,
+    'category_format': _format('Category', r'[A-Z_]+'),
+    'rating_range': _rating_range,
+    'reviews_format': _reviews,
+    'size_format': _format('Size', r'\d+(\.\d+)?[Mk]|Varies with device'),
+    'installs_format': _installs,
+    'type_domain': _domain('Type', TYPES),
+    'price_format': _format('Price', r'0|\$\d+(\.\d+)?'),
+    'content_rating_domain': _domain('Content Rating', CONTENT_RATINGS),
+    'last_updated_format': _last_updated,
+}
+
+
+# Split a raw chunk into rows that pass every rule and quarantined rows,
+# which get a 'Reason' column listing every rule they broke. Also returns
+# the number of rows failing each rule.
+def validate_chunk(chunk):
+    failures = pd.DataFrame({code: rule(chunk) for code, rule in RULES.items()}, index=chunk.index)
+    bad = failures.any(axis=1)
+
+    quarantine = chunk[bad].copy()
+    flagged = failures[bad]
+    codes = pd.Series([code + ';' for code in flagged.columns], index=flagged.columns, dtype=object)
+    quarantine['Reason'] = flagged.astype(object).dot(codes).str.rstrip(';') if len(flagged) else pd.Series(dtype=str)
+    return chunk[~bad], quarantine, failures.sum()
@@ -0,0 +1,103 @@
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+
+# Default memory budget of one session's cache
+DEFAULT_BUDGET_MB = 16
+
+
+# Approximate memory held by a cached value
+def value_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sys.getsizeof(value)
+
+
+# Hashable form of view parameters; lists and dicts become tuples
+def freeze(params):
+    if isinstance(params, dict):
+        return tuple(sorted((key, freeze(value)) for key, value in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(freeze(value) for value in params)
+    return params
+
+
+def _release(held):
+    instrumentation.increment('view_cache.bytes', -held[0])
+    instrumentation.increment('view_cache.sessions', -1)
+    held[0] = 0
+
+
+# Filtered views and derived frames of one session, keyed by view name,
+# parameters and dataset version. Entries of an older version are dropped as
+# soon as a newer version is seen, and the rest are evicted least recently
+# used first once their total size passes the budget. Hits, misses,
+# evictions and the bytes held by all sessions are recorded in
+# instrumentation; the bytes are given back when the cache is cleared or
+# garbage collected with its session.
+class ViewCache:
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 2 ** 20)
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        # Bytes currently held, in a list the finalizer can read after the cache is gone
+        self._held = [0]
+        self._finalizer = weakref.finalize(self, _release, self._held)
+        instrumentation.increment('view_cache.sessions')
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._held[0]
+
+    # Cached value of a view, computed with compute() on a miss
+    def get(self, name, version, params, compute):
+        key = (name, version, freeze(params))
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._drop_all()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                instrumentation.increment('view_cache.hits')
+                return self._entries[key][0]
+        instrumentation.increment('view_cache.misses')
+        value = compute()
+        size = value_bytes(value)
+        # A view larger than the whole budget is returned without being kept
+        if size > self.budget:
+            return value
+        with self._lock:
+            if version == self._version and key not in self._entries:
+                self._entries[key] = (value, size)
+                self._add(size)
+            while self._held[0] > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._add(-evicted)
+                instrumentation.increment('view_cache.evictions')
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._drop_all()
+
+    def _drop_all(self):
+        self._entries.clear()
+        self._add(-self._held[0])
+
+    def _add(self, size):
+        self._held[0] += size
+        instrumentation.increment('view_cache.bytes', size)